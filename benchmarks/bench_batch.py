@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+#
+# Compares the gather of AIX_facts with a fork per command and with batch: true,
+# which runs all commands in one shell. The AIX commands are emulated by shell
+# scripts which sleep --command-latency seconds and print generated output.
+# Forking the python process of the module is expensive on AIX, that is emulated by
+# --fork-latency seconds before every run_command, under a lock because the fork
+# of a large process does not run in parallel.
+#
+# Needs ansible to be importable, because the collectors import AnsibleModule.
+#
+#   python benchmarks/bench_batch.py --fork-latency 0.2
+#
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+import optparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import benchutil
+import generators
+AIX_facts = benchutil.load_library('AIX_facts')
+engine = benchutil.load_collector('engine')
+
+# the collectors which run commands
+NAMES = ('oslevel', 'lpps', 'filesystems', 'mounts', 'lssrc', 'lparstat')
+
+
+class ForkingModule(object):
+    """
+    Stands in for the AnsibleModule, run_command runs the emulated commands in bindir
+    after the fork latency
+    """
+    fork_lock = threading.Lock()
+
+    def __init__(self, bindir, fork_latency):
+        self.bindir = bindir
+        self.fork_latency = fork_latency
+        self.params = {'mount_timeout': 5}
+        self.forks = 0
+
+    def _rewrite(self, text):
+        return text.replace('/usr/bin/', self.bindir + '/').replace('/usr/sbin/', self.bindir + '/')
+
+    def run_command(self, args, data=None, **kwargs):
+        with self.fork_lock:
+            time.sleep(self.fork_latency)
+            self.forks += 1
+        if isinstance(args, list):
+            args = [self._rewrite(arg) for arg in args]
+        else:
+            args = ['/bin/sh', '-c', self._rewrite(args)]
+        p = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+        out, err = p.communicate(self._rewrite(data) if data else None)
+        return p.returncode, out, err
+
+    def get_bin_path(self, name, *args, **kwargs):
+        return None
+
+    def fail_json(self, **kwargs):
+        raise SystemExit(kwargs)
+
+
+def make_commands(bindir, options):
+    outputs = {
+        'oslevel': '7100-04-03-1642\n',
+        'lslpp': generators.lslpp_Lc(options.filesets),
+        'lsfs': generators.lsfs_c(options.filesystems),
+        'mount': generators.mount(options.filesystems),
+        'lssrc': generators.lssrc_a(500),
+        'lparstat': generators.lparstat_i(),
+    }
+    for name, out in outputs.items():
+        with open(os.path.join(bindir, name + '.out'), 'w') as f:
+            f.write(out)
+        path = os.path.join(bindir, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\nsleep %s\ncat %s.out\n' % (options.command_latency, path))
+        os.chmod(path, 0o755)
+
+
+def gather(bindir, options, batch):
+    module = ForkingModule(bindir, options.fork_latency)
+    collectors = [(name, loader()) for name, loader in AIX_facts.COLLECTORS if name in NAMES]
+    start = time.time()
+    facts, errors, cache_status, profile = engine.run_collectors(module, collectors, batch=batch)
+    seconds = time.time() - start
+    if errors:
+        raise SystemExit(errors)
+    return seconds, module.forks, facts
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--filesets', type='int', default=10000)
+    parser.add_option('--filesystems', type='int', default=500)
+    parser.add_option('--fork-latency', type='float', default=0.1, help='seconds per fork of the module')
+    parser.add_option('--command-latency', type='float', default=0.05, help='seconds every command takes')
+    options, args = parser.parse_args()
+
+    bindir = tempfile.mkdtemp()
+    try:
+        make_commands(bindir, options)
+        results = [gather(bindir, options, batch) for batch in (False, True)]
+    finally:
+        shutil.rmtree(bindir)
+    # the mounts do not exist here, so their size is None in both gathers
+    same = results[0][2] == results[1][2]
+    print('%-10s %8s %6s' % ('mode', 'seconds', 'forks'))
+    for mode, (seconds, forks, facts) in zip(('per fork', 'batch'), results):
+        print('%-10s %8.3f %6d' % (mode, seconds, forks))
+    print('the facts are %s' % ('the same' if same else 'different'))
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
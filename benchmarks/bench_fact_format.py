@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+#
+# Compares the size and the serialization time of the list facts of AIX_facts
+# in fact_format records and columnar. The facts are parsed from synthetic
+# command output, converted, serialized with json like the module does, and
+# expanded again with the aix_records filter to check the round trip.
+#
+# Needs ansible to be importable, because the collectors import AnsibleModule.
+#
+#   python benchmarks/bench_fact_format.py --filesets 50000
+#
+import os
+import sys
+import json
+import timeit
+import optparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'filter_plugins'))
+import benchutil
+import generators
+import aix_facts
+parsers = benchutil.load_collector('parsers')
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--filesets', type='int', default=10000)
+    parser.add_option('--filesystems', type='int', default=2000)
+    parser.add_option('--subsystems', type='int', default=500)
+    parser.add_option('--repeat', type='int', default=5, help='number of runs to take the best time of')
+    options, args = parser.parse_args()
+
+    facts = {
+        'lpps': parsers.convert_out_to_list(generators.lslpp_Lc(options.filesets)),
+        'filesystems': parsers.convert_out_to_list(generators.lsfs_c(options.filesystems)),
+        'lssrc': [dict(zip(('Subsystem', 'Group', 'PID', 'Status'),
+                           (line[0:18].strip(), line[18:34].strip(), line[34:48].strip(), line[48:60].strip())))
+                  for line in generators.lssrc_a(options.subsystems).splitlines()[1:]],
+    }
+    failed = 0
+    print('%-12s %12s %12s %10s %10s %10s' % ('fact', 'records KB', 'columnar KB', 'records ms',
+                                            'columnar ms', 'convert ms'))
+    for name in ('lpps', 'filesystems', 'lssrc'):
+        records = facts[name]
+        columnar = parsers.records_to_columns(records)
+        if aix_facts.aix_records(columnar) != records:
+            failed += 1
+            print('%s: aix_records does not return the records' % name)
+        sizes = [len(json.dumps(records)), len(json.dumps(columnar))]
+        times = [min(timeit.repeat(lambda: json.dumps(fact), number=1, repeat=options.repeat))
+                 for fact in (records, columnar)]
+        convert = min(timeit.repeat(lambda: parsers.records_to_columns(records), number=1, repeat=options.repeat))
+        print('%-12s %12d %12d %10.2f %10.2f %10.2f' % (name, sizes[0] // 1024, sizes[1] // 1024,
+                                                        times[0] * 1000, times[1] * 1000, convert * 1000))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# Compares the ODM reader of the lpps collector (lpps_method: odm) with the lslpp -Lc path.
+# Both paths are fed with the captured command output in fixtures/, the records are
+# compared on the columns the ODM holds and the time per gather is reported.
+# The fixtures can be multiplied with --scale to get the size of a large host.
+#
+# Needs ansible to be importable, because the collectors import AnsibleModule.
+#
+#   python benchmarks/bench_lpps_odm.py --scale 500
+#
+import os
+import sys
+import timeit
+import re
+import optparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, 'fixtures')
+sys.path.insert(0, HERE)
+import benchutil
+lpps = benchutil.load_collector('lpps')
+
+# the columns both paths fill from the same source
+COMPARED = ('Package_Name', 'Fileset', 'Level', 'PTF_Id', 'Fix_State', 'Type', 'Description')
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+# every copy of a fixture gets its number appended to the fileset names, the first copy is unchanged
+def _scale_lslpp(out, scale):
+    lines = out.splitlines(True)
+    body = []
+    for i in range(scale):
+        suffix = str(i or '')
+        for line in lines[1:]:
+            fields = line.split(':')
+            if fields[6] == 'R':
+                fields[0] += suffix
+                fields[1] = fields[0] + '-' + fields[2]
+            else:
+                fields[1] += suffix
+            body.append(':'.join(fields))
+    return lines[0] + ''.join(body)
+
+
+def _scale_odm(out, scale):
+    body = []
+    for i in range(scale):
+        body.append(re.sub(r'lpp_name = "([^"]*)"', r'lpp_name = "\g<1>%s"' % (i or ''), out))
+    return ''.join(body)
+
+
+def _scale_rpm(out, scale):
+    body = []
+    for i in range(scale):
+        for line in out.splitlines(True):
+            body.append(line.replace('\t', '%s\t' % (i or ''), 1))
+    return ''.join(body)
+
+
+class ReplayModule(object):
+    """
+    Stands in for the AnsibleModule, run_command returns the fixture for the command
+    """
+    def __init__(self, outputs, lpps_method):
+        self.outputs = outputs
+        self.params = {'lpps_method': lpps_method}
+
+    def run_command(self, args, **kwargs):
+        if args[0] == '/usr/bin/env':
+            return 0, self.outputs[args[1]], ''
+        return 0, self.outputs[os.path.basename(args[0])], ''
+
+    def get_bin_path(self, name, *args, **kwargs):
+        return '/usr/bin/' + name
+
+    def fail_json(self, **kwargs):
+        raise SystemExit(kwargs)
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--scale', type='int', default=1, help='multiply the fixtures')
+    parser.add_option('--repeat', type='int', default=5, help='number of gathers to time')
+    options, args = parser.parse_args()
+
+    outputs = {
+        'lslpp': _scale_lslpp(_read('lslpp_Lc.txt'), options.scale),
+        'ODMDIR=/usr/lib/objrepos': _scale_odm(_read('odmget_product_usr.txt'), options.scale),
+        'ODMDIR=/usr/share/lib/objrepos': _scale_odm(_read('odmget_product_share.txt'), options.scale),
+        'rpm': _scale_rpm(_read('rpm_qa.txt'), options.scale),
+    }
+    lslpp_module = ReplayModule(outputs, 'lslpp')
+    odm_module = ReplayModule(outputs, 'odm')
+
+    lslpp_lpps = lpps.get_lpps(lslpp_module)
+    odm_lpps = lpps.get_lpps(odm_module)
+    key = lambda r: r['Fileset']
+    differences = 0
+    for a, b in zip(sorted(lslpp_lpps, key=key), sorted(odm_lpps, key=key)):
+        for column in COMPARED:
+            if a[column] != b[column]:
+                differences += 1
+                print('%s %s: lslpp %r odm %r' % (a['Fileset'], column, a[column], b[column]))
+    if len(lslpp_lpps) != len(odm_lpps):
+        differences += 1
+        print('lslpp has %d records, odm has %d' % (len(lslpp_lpps), len(odm_lpps)))
+
+    print('records: %d, differences on %s: %d' % (len(lslpp_lpps), ', '.join(COMPARED), differences))
+    for name, module in (('lslpp', lslpp_module), ('odm', odm_module)):
+        seconds = min(timeit.repeat(lambda: lpps.get_lpps(module), number=1, repeat=options.repeat))
+        print('%-6s parse %8.2f ms' % (name, seconds * 1000))
+    print('the command time is not included, time lslpp -Lc and odmget product on the host to compare it')
+    return 1 if differences else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
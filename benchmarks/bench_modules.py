@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+#
+# Times whole modules end to end against the fake AIX commands of fakeaix.py.
+# Every run is a new python process which runs the module file with the arguments
+# in a json file, like ansible runs a module on the host. The fake commands are
+# installed in a temporary directory which the modules use through ANSIBLE_AIX_BIN_PATH.
+# The FAKEAIX_* variables of the environment are passed on, so the size, the latency
+# and the failures of the commands can be set, see fakeaix.py.
+#
+# Needs ansible to be importable.
+#
+#   python benchmarks/bench_modules.py
+#   FAKEAIX_LATENCY=0.1 python benchmarks/bench_modules.py --filesets 50 --repeat 3
+#
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import optparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import benchutil
+import generators
+
+
+def scenarios(tmpdir, filesets):
+    """
+    returns a list of (name, module, arguments)
+    """
+    cache_dir = os.path.join(tmpdir, 'cache')
+    # the names generators.lslpp_Lc gives the installed filesets
+    names = ['%s.fs%05d.rte' % (generators.PACKAGES[i % len(generators.PACKAGES)], i) for i in range(filesets)]
+    return [
+        ('AIX_facts', 'AIX_facts', {'cache_dir': cache_dir}),
+        ('AIX_facts batch', 'AIX_facts', {'cache_dir': cache_dir, 'batch': True}),
+        ('AIX_nimclient present %d' % filesets, 'AIX_nimclient',
+         {'name': names, 'state': 'present', 'lpp_source': 'lpp_7100-04-03'}),
+        ('AIX_nimclient absent %d' % filesets, 'AIX_nimclient', {'name': names, 'state': 'absent'}),
+    ]
+
+
+def run_module(name, args_file):
+    """
+    runs library/<name>.py in this process with the arguments in args_file, the module exits
+    """
+    import runpy
+    benchutil.add_module_utils()
+    path = os.path.join(benchutil.LIBRARY, name + '.py')
+    sys.argv = [path, args_file]
+    runpy.run_path(path, run_name='__main__')
+
+
+def time_module(name, args, tmpdir, env):
+    """
+    returns the seconds, the number of commands run and the result of one run of the module
+    """
+    args_file = os.path.join(tmpdir, 'args.json')
+    with open(args_file, 'w') as f:
+        json.dump({'ANSIBLE_MODULE_ARGS': args}, f)
+    # every run starts on an unchanged host
+    for path in (env['FAKEAIX_STATE'], os.path.join(tmpdir, 'cache')):
+        shutil.rmtree(path, ignore_errors=True)
+    os.mkdir(env['FAKEAIX_STATE'])
+    open(env['FAKEAIX_LOG'], 'w').close()
+
+    start = time.time()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--run', name, args_file],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    out, err = process.communicate()
+    seconds = time.time() - start
+
+    with open(env['FAKEAIX_LOG']) as f:
+        commands = len(f.readlines())
+    try:
+        result = json.loads(out.decode('utf-8'))
+    except ValueError:
+        result = {'failed': True, 'msg': (out + err).decode('utf-8', 'replace').strip()}
+    return seconds, commands, result
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--filesets', type='int', default=50, help='number of filesets AIX_nimclient gets')
+    parser.add_option('--repeat', type='int', default=3, help='number of runs to take the best time of')
+    parser.add_option('--run', nargs=2, help=optparse.SUPPRESS_HELP)
+    options, args = parser.parse_args()
+
+    if options.run:
+        run_module(*options.run)
+        return 0
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        bindir = os.path.join(tmpdir, 'bin')
+        subprocess.check_call([sys.executable, os.path.join(HERE, 'fakeaix.py'), 'install', bindir])
+        env = dict(os.environ)
+        env.update({
+            'ANSIBLE_AIX_BIN_PATH': bindir,
+            'FAKEAIX_STATE': os.path.join(tmpdir, 'state'),
+            'FAKEAIX_LOG': os.path.join(tmpdir, 'commands.log'),
+            'PYTHONPATH': os.pathsep.join([HERE] + [p for p in sys.path if p]),
+        })
+
+        print('%-32s %10s %9s %8s  %s' % ('module', 'seconds', 'commands', 'changed', 'msg'))
+        failed = 0
+        for name, module, arguments in scenarios(tmpdir, options.filesets):
+            runs = [time_module(module, arguments, tmpdir, env) for i in range(options.repeat)]
+            seconds, commands, result = min(runs, key=lambda run: run[0])
+            if result.get('failed'):
+                failed += 1
+            msg = result.get('msg', '')
+            if not isinstance(msg, str):
+                msg = json.dumps(msg)
+            print('%-32s %10.3f %9d %8s  %s' % (name, seconds, commands, result.get('changed', '-'),
+                                                 ('FAILED ' if result.get('failed') else '') + msg[:60]))
+    finally:
+        shutil.rmtree(tmpdir)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+#
+# Benchmarks the parsers of the AIX_facts collectors with synthetic command output at fleet sizes.
+# The collectors get a stub module whose run_command returns the generated output,
+# so the suite runs on any Linux box. For every parser the best time of --repeat runs
+# and the peak memory of one run (python 3 only, tracemalloc) are reported.
+#
+# Needs ansible to be importable, because the collectors import AnsibleModule.
+#
+#   python benchmarks/bench_parsers.py
+#   python benchmarks/bench_parsers.py --filesets 50000 --repeat 3 --json > bench.json
+#
+import os
+import sys
+import gc
+import json
+import shutil
+import tempfile
+import timeit
+import optparse
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import benchutil
+import generators
+parsers = benchutil.load_collector('parsers')
+lpps = benchutil.load_collector('lpps')
+filesystems = benchutil.load_collector('filesystems')
+mounts = benchutil.load_collector('mounts')
+vgs = benchutil.load_collector('vgs')
+lssrc = benchutil.load_collector('lssrc')
+lparstat = benchutil.load_collector('lparstat')
+niminfo = benchutil.load_collector('niminfo')
+
+
+class StubModule(object):
+    """
+    Stands in for the AnsibleModule, run_command returns the output generated for the command
+    """
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.params = {}
+
+    def run_command(self, args, **kwargs):
+        if not isinstance(args, list):
+            args = args.split()
+        if args[0].endswith('lsvg') and args[-1] == '-p':
+            return 0, self.outputs['lsvg -p'], ''
+        return 0, self.outputs[os.path.basename(args[0])], ''
+
+    def get_bin_path(self, name, *args, **kwargs):
+        return '/usr/sbin/' + name
+
+    def fail_json(self, **kwargs):
+        raise SystemExit(kwargs)
+
+
+def measure(parser, repeat):
+    """
+    returns the best time in seconds, the peak memory in bytes (or None) and the number of records
+    """
+    gc.collect()
+    seconds = min(timeit.repeat(parser, number=1, repeat=repeat))
+    peak = None
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        result = parser()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        result = parser()
+    return seconds, peak, len(result)
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--filesets', type='int', default=10000)
+    parser.add_option('--filesystems', type='int', default=2000)
+    parser.add_option('--mounts', type='int', default=2000)
+    parser.add_option('--vgs', type='int', default=200)
+    parser.add_option('--subsystems', type='int', default=500)
+    parser.add_option('--repeat', type='int', default=5, help='number of runs to take the best time of')
+    parser.add_option('--json', action='store_true', help='print the results as json')
+    options, args = parser.parse_args()
+
+    outputs = {
+        'lslpp': generators.lslpp_Lc(options.filesets),
+        'lsfs': generators.lsfs_c(options.filesystems),
+        'mount': generators.mount(options.mounts),
+        'lsvg -p': generators.lsvg_p(options.vgs),
+        'lsvg': generators.lsvg(options.vgs),
+        'lssrc': generators.lssrc_a(options.subsystems),
+        'lparstat': generators.lparstat_i(),
+    }
+    module = StubModule(outputs)
+    # the mountpoints do not exist here, so statvfs fails fast, like it does on a healthy host
+    module.params['mount_timeout'] = 5
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        niminfo.NIMINFO = os.path.join(tmpdir, 'niminfo')
+        with open(niminfo.NIMINFO, 'w') as f:
+            f.write(generators.niminfo(hosts=200))
+
+        benches = [
+            ('convert_out_to_list lslpp -Lc', lambda: parsers.convert_out_to_list(outputs['lslpp'])),
+            ('convert_out_to_list lsfs -c', lambda: parsers.convert_out_to_list(outputs['lsfs'])),
+            ('get_lpps', lambda: lpps.get_lpps(module)),
+            ('get_filesystems', lambda: filesystems.get_filesystems(module)),
+            ('get_mounts', lambda: mounts.get_mounts(module)),
+            ('get_vgs', lambda: vgs.get_vgs(module)),
+            ('get_lssrc', lambda: lssrc.get_lssrc(module)),
+            ('get_lparstat', lambda: lparstat.get_lparstat(module)[0]),
+            ('get_niminfo', lambda: niminfo.get_niminfo(module)),
+        ]
+        results = []
+        for name, run in benches:
+            seconds, peak, records = measure(run, options.repeat)
+            results.append({'parser': name, 'ms': round(seconds * 1000, 3),
+                            'peak_kb': None if peak is None else peak // 1024, 'records': records})
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if options.json:
+        print(json.dumps({'sizes': {'filesets': options.filesets, 'filesystems': options.filesystems,
+                                    'mounts': options.mounts, 'vgs': options.vgs,
+                                    'subsystems': options.subsystems},
+                          'results': results}, indent=2))
+    else:
+        print('%-32s %10s %10s %8s' % ('parser', 'ms', 'peak KB', 'records'))
+        for r in results:
+            print('%-32s %10.2f %10s %8d' % (r['parser'], r['ms'],
+                                             '-' if r['peak_kb'] is None else r['peak_kb'], r['records']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# Compares the version comparison of module_utils/aix/version.py with the zero
+# filled string tuples AIX_nimclient used before, on the question install() asks
+# for every fileset: is the latest version in the lpp_source newer than the
+# installed one. The versions are LPP levels and RPM versions like showres lists them.
+# It reports the time for all filesets, with the memo of version_key cold and warm,
+# and checks both on pairs of which the order is known.
+#
+# Needs ansible to be importable, like the other benchmarks.
+#
+#   python benchmarks/bench_version.py --filesets 20000
+#
+import sys
+import os
+import random
+import timeit
+import optparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import benchutil
+import generators
+version = benchutil.load_collector('version')
+
+# pairs of (older, newer)
+KNOWN = [('7.1.4.4', '7.1.4.30'), ('6.1.9.100', '7.1.0.0'), ('1.0-9', '1.0-10'), ('1.9-9', '1.9.1-1'),
+         ('2.4.1-3', '2.4.10-1'), ('1.0~rc1-1', '1.0-1'), ('9.9-9', '1:1.0-1'), ('1.0-1', '1.0a-1')]
+
+
+def zero_filled(v):
+    """
+    the key AIX_nimclient used before version.py
+    """
+    return tuple(point.zfill(8) for point in v.split('.'))
+
+
+def index(filesets, seed=1):
+    """
+    returns the versions of every fileset in an lpp_source and the installed version, like
+    _lpp_source_index and _installed_index give them, a tenth of the filesets are RPMs
+    """
+    rnd = random.Random(seed)
+    available = {}
+    installed = {}
+    for i in range(filesets):
+        if i % 10:
+            versions = [rnd.choice(generators.LEVELS) for k in range(rnd.randint(1, 4))]
+        else:
+            versions = ['%d.%d-%d' % (rnd.randint(1, 3), rnd.randint(0, 12), rnd.randint(1, 12))
+                        for k in range(rnd.randint(1, 4))]
+        available['fs%05d' % i] = versions
+        installed['fs%05d' % i] = rnd.choice(versions)
+    return available, installed
+
+
+def old_install(available, installed):
+    return [fs for fs in available if zero_filled(installed[fs]) < zero_filled(max(available[fs], key=zero_filled))]
+
+
+def new_install(available, installed):
+    return [fs for fs in available if version.latest_version(available[fs], newer_than=installed[fs])]
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--filesets', type='int', default=10000, help='number of filesets in the lpp_source')
+    parser.add_option('--repeat', type='int', default=5, help='number of runs to take the best time of')
+    options, args = parser.parse_args()
+
+    failed = 0
+    for name, key in (('zero filled', zero_filled), ('version_key', version.version_key)):
+        wrong = [(a, b) for a, b in KNOWN if not key(a) < key(b)]
+        if name == 'version_key':
+            failed += len(wrong)
+        print('%-12s wrong on %d of %d known pairs %s' % (name, len(wrong), len(KNOWN),
+                                                         ' '.join('%s<%s' % pair for pair in wrong)))
+
+    available, installed = index(options.filesets)
+    sorted_available = dict((fs, version.sort_versions(versions)) for fs, versions in available.items())
+
+    def cold():
+        version._keys.clear()
+        new_install(sorted_available, installed)
+
+    times = [
+        ('zero filled', lambda: old_install(available, installed)),
+        ('version_key cold', cold),
+        ('version_key warm', lambda: new_install(sorted_available, installed)),
+        ('sort the index', lambda: [version.sort_versions(v) for v in available.values()]),
+    ]
+    print('%d filesets, %d distinct versions' % (options.filesets,
+                                                 len(set(v for vs in available.values() for v in vs))))
+    for name, function in times:
+        seconds = min(timeit.repeat(function, number=1, repeat=options.repeat))
+        print('%-20s %8.2f ms' % (name, seconds * 1000))
+    old = set(old_install(available, installed))
+    new = set(new_install(sorted_available, installed))
+    print('filesets to install: zero filled %d, version_key %d, different %d' % (
+        len(old), len(new), len(old ^ new)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+#
+# Helpers shared by the benchmarks.
+#
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LIBRARY = os.path.join(HERE, '..', 'library')
+MODULE_UTILS = os.path.join(HERE, '..', 'module_utils')
+
+
+def add_module_utils():
+    """
+    makes the module_utils of the repository importable as ansible.module_utils,
+    like ansible does for the module_utils next to a playbook
+    """
+    import ansible.module_utils
+    path = os.path.abspath(MODULE_UTILS)
+    if path not in ansible.module_utils.__path__:
+        ansible.module_utils.__path__.append(path)
+
+
+def load_collector(name):
+    """
+    imports the collector module_utils/aix/<name>.py
+    """
+    add_module_utils()
+    return __import__('ansible.module_utils.aix.' + name, fromlist=[name])
+
+
+def load_library(name):
+    """
+    imports the module library/<name>.py, which is no package so it has to be loaded from its path
+    """
+    add_module_utils()
+    path = os.path.join(LIBRARY, name + '.py')
+    try:
+        import importlib.util
+    except ImportError:
+        import imp
+        return imp.load_source(name, path)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
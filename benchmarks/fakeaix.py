@@ -0,0 +1,464 @@
+#!/usr/bin/env python
+#
+# Stand-ins for the AIX commands the modules run, so the modules can be run and
+# timed end to end on a Linux box.
+#
+# The command is taken from the name the script is called by, or from the first
+# argument, so one script serves all commands:
+#
+#   python benchmarks/fakeaix.py install /tmp/fakeaix    # a wrapper per command
+#   ANSIBLE_AIX_BIN_PATH=/tmp/fakeaix ansible-playbook ...
+#   python benchmarks/fakeaix.py lslpp -Lc
+#
+# The modules use the commands in ANSIBLE_AIX_BIN_PATH instead of the real ones.
+# The output is made by generators.py and configured with the environment:
+#
+#   FAKEAIX_FILESETS      number of installp filesets (2000), a tenth as many RPMs
+#   FAKEAIX_FILESYSTEMS   number of filesystems and mounts (200)
+#   FAKEAIX_VGS           number of volume groups (10)
+#   FAKEAIX_SUBSYSTEMS    number of SRC subsystems (100)
+#   FAKEAIX_EFIXES        number of installed efixes (5)
+#   FAKEAIX_LATENCY       seconds every command sleeps before it answers (0)
+#   FAKEAIX_LATENCY_<CMD> the same for one command, f.i. FAKEAIX_LATENCY_LSLPP=2
+#   FAKEAIX_FAIL          commands which fail, f.i. lsvg,lssrc:3 (rc 1 unless given)
+#   FAKEAIX_HANG          commands which never answer, f.i. lsvg
+#   FAKEAIX_STATE         directory in which the changes of installp, rpm -e, nimclient -o cust,
+#                         emgr, crfs, rmfs and the itab commands are kept, without it nothing changes
+#   FAKEAIX_LOG           file to which every command line is appended
+#
+import os
+import sys
+import json
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import generators
+
+COMMANDS = ('oslevel', 'lslpp', 'odmget', 'rpm', 'installp', 'lsfs', 'crfs', 'rmfs', 'lslv', 'mount',
+            'umount', 'lsvg', 'lssrc', 'lparstat', 'emgr', 'nimclient', 'lsitab', 'mkitab', 'chitab',
+            'rmitab')
+
+OSLEVEL = '7100-04-03-1642'
+BOS_RTE = 'bos:bos.rte:7.1.4.30: : :C: :Base Operating System Runtime: : : : : : :0:0:/:1642'
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+class State(object):
+    """
+    The changes the commands made, kept in FAKEAIX_STATE/state.json
+    """
+    def __init__(self):
+        self.dir = os.environ.get('FAKEAIX_STATE')
+        self.data = {'removed': [], 'levels': {}, 'inittab': {}, 'efixes': None, 'filesystems': []}
+        if self.dir and os.path.exists(self.path()):
+            with open(self.path()) as f:
+                self.data.update(json.load(f))
+
+    def path(self):
+        return os.path.join(self.dir, 'state.json')
+
+    def save(self):
+        if not self.dir:
+            return
+        if not os.path.isdir(self.dir):
+            os.makedirs(self.dir)
+        tmp = self.path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.data, f)
+        os.rename(tmp, self.path())
+
+
+def _lpp_lines(state):
+    """
+    the lines of lslpp -Lc without the header, with the changes of the state
+    """
+    out = generators.lslpp_Lc(_env_int('FAKEAIX_FILESETS', 2000))
+    lines = out.splitlines()[1:] + [BOS_RTE]
+    removed = set(state.data['removed'])
+    levels = state.data['levels']
+    result = []
+    for line in lines:
+        fields = line.split(':')
+        if fields[1] in removed or fields[0] in removed:
+            continue
+        if fields[1] in levels:
+            fields[2] = levels[fields[1]]
+        result.append(':'.join(fields))
+    return result
+
+
+def _next_level(level):
+    """
+    the level of the update of a fileset in the lpp_source
+    """
+    if '-' in level:
+        version, release = level.rsplit('-', 1)
+        return '%s-%d' % (version, int(release) + 1)
+    parts = level.split('.')
+    parts[-1] = str(int(parts[-1]) + 1)
+    return '.'.join(parts)
+
+
+def _options(args):
+    """
+    splits the arguments in the letters of the flags and the other arguments
+    """
+    flags = ''
+    names = []
+    for arg in args:
+        if arg.startswith('-'):
+            flags += arg[1:]
+        else:
+            names.append(arg)
+    return flags, names
+
+
+def _attributes(args):
+    """
+    returns the -a attr=value arguments of nimclient as a dictionary
+    """
+    attributes = {}
+    for i, arg in enumerate(args):
+        if arg == '-a' and i + 1 < len(args) and '=' in args[i + 1]:
+            key, value = args[i + 1].split('=', 1)
+            attributes[key] = value.strip('"')
+    return attributes
+
+
+def oslevel(args, state):
+    if '-r' in args:
+        return 0, OSLEVEL[:7] + '\n', ''
+    return 0, OSLEVEL + '\n', ''
+
+
+def lslpp(args, state):
+    flags, names = _options(args)
+    lines = _lpp_lines(state)
+    out = []
+    if 'q' not in flags:
+        out.append(generators.LSLPP_HEADER)
+    if not names:
+        out.extend(lines)
+        return 0, '\n'.join(out) + '\n', ''
+    by_name = {}
+    for line in lines:
+        fields = line.split(':')
+        by_name.setdefault(fields[1], line)
+        if fields[6] == 'R':
+            by_name.setdefault(fields[0], line)
+    err = []
+    for name in names:
+        if name in by_name:
+            out.append(by_name[name])
+        else:
+            err.append('lslpp: 0504-132  Fileset %s not installed.' % name)
+    return (1 if err else 0), '\n'.join(out) + '\n', ''.join(e + '\n' for e in err)
+
+
+def odmget(args, state):
+    if os.environ.get('ODMDIR', '/etc/objrepos') != '/usr/lib/objrepos':
+        return 0, '', ''
+    out = []
+    for line in _lpp_lines(state):
+        fields = line.split(':')
+        if fields[6] == 'R':
+            continue
+        level = (fields[2].split('.') + ['0', '0', '0', '0'])[:4]
+        out.append('product:\n\tlpp_name = "%s"\n\tname = "%s"\n\tver = %s\n\trel = %s\n\tmod = %s\n\tfix = %s\n'
+                   '\tptf = "%s"\n\tstate = 5\n\tdescription = "%s"\n' % (
+                       fields[1], fields[0], level[0], level[1], level[2], level[3],
+                       fields[4].strip(), fields[7]))
+    return 0, '\n'.join(out), ''
+
+
+def _installed_names(state):
+    """
+    the names lslpp finds: the filesets and the package names of the RPMs
+    """
+    names = set()
+    for line in _lpp_lines(state):
+        fields = line.split(':')
+        names.add(fields[1])
+        if fields[6] == 'R':
+            names.add(fields[0])
+    return names
+
+
+def rpm(args, state):
+    if args[:1] == ['-e']:
+        # like rpm, nothing is removed when one of the packages is not installed
+        missing = [name for name in args[1:] if name not in _installed_names(state)]
+        if missing:
+            return 1, '', ''.join('error: package %s is not installed\n' % name for name in missing)
+        state.data['removed'].extend(args[1:])
+        state.save()
+        return 0, '', ''
+    out = []
+    for line in _lpp_lines(state):
+        fields = line.split(':')
+        if fields[6] == 'R':
+            out.append('%s\t%s\t%s\t%s\t%s\n' % (fields[0], fields[2], fields[16], ':'.join(fields[17:]), fields[7]))
+    return 0, ''.join(out), ''
+
+
+def installp(args, state):
+    flags, names = _options(args)
+    summary = ['Installation Summary', '--------------------',
+               'Name                        Level           Part        Event       Result',
+               '-------------------------------------------------------------------------------']
+    rc = 0
+    if 'u' in flags:
+        levels = dict((line.split(':')[1], line.split(':')[2]) for line in _lpp_lines(state))
+        removed = []
+        for name in names:
+            if name in levels:
+                removed.append(name)
+                summary.append('%-28s%-16s%-12s%-12s%s' % (name, levels[name], 'USR', 'DEINSTALL', 'SUCCESS'))
+            else:
+                rc = 1
+        state.data['removed'].extend(removed)
+        state.save()
+    return rc, '\n'.join(summary) + '\n', ''
+
+
+def lsfs(args, state):
+    flags, names = _options(args)
+    out = generators.lsfs_c(_env_int('FAKEAIX_FILESYSTEMS', 200))
+    lines = out.splitlines()
+    lines.extend('%s:/dev/%s:jfs2::::rw:yes:no' % (mp, os.path.basename(mp)) for mp in state.data['filesystems'])
+    if names:
+        lines = [lines[0]] + [line for line in lines[1:] if line.split(':')[0] in names]
+        if len(lines) == 1:
+            return 1, '', "lsfs: No record matching '%s' was found in /etc/filesystems.\n" % names[0]
+    if 'c' not in flags:
+        lines = [line.replace(':', ' ') for line in lines]
+    return 0, '\n'.join(lines) + '\n', ''
+
+
+def crfs(args, state):
+    mountpoint = args[args.index('-m') + 1] if '-m' in args else None
+    if mountpoint:
+        state.data['filesystems'].append(mountpoint)
+        state.save()
+    return 0, 'File system created successfully.\n', ''
+
+
+def rmfs(args, state):
+    flags, names = _options(args)
+    for name in names:
+        if name in state.data['filesystems']:
+            state.data['filesystems'].remove(name)
+    state.save()
+    return 0, '', ''
+
+
+def lslv(args, state):
+    return 0, 'LOGICAL VOLUME:     %s                 VOLUME GROUP:   datavg001\n' % (args[-1] if args else ''), ''
+
+
+def mount(args, state):
+    if args:
+        return 0, '', ''
+    return 0, generators.mount(_env_int('FAKEAIX_FILESYSTEMS', 200)), ''
+
+
+def umount(args, state):
+    return 0, '', ''
+
+
+def _vg_blocks(out, start):
+    """
+    splits the output of a generator in the blocks of every vg, a block begins with a line
+    for which start returns the name of the vg
+    """
+    blocks = {}
+    vg = None
+    for line in out.splitlines(True):
+        name = start(line)
+        if name:
+            vg = name
+        if vg is not None:
+            blocks[vg] = blocks.get(vg, '') + line
+    return blocks
+
+
+def lsvg(args, state):
+    flags, names = _options(args)
+    vgs = _env_int('FAKEAIX_VGS', 10)
+    if 'o' in flags:
+        return 0, ''.join(vg + '\n' for vg in generators.vg_names(vgs)), ''
+    if 'p' in flags:
+        blocks = _vg_blocks(generators.lsvg_p(vgs),
+                            lambda line: line[:-2] if line.endswith(':\n') and ' ' not in line else None)
+    else:
+        blocks = _vg_blocks(generators.lsvg(vgs),
+                            lambda line: line.split()[2] if line.startswith('VOLUME GROUP:') else None)
+    missing = [name for name in names if name not in blocks]
+    if missing:
+        return 1, '', '0516-306 lsvg: Unable to find volume group %s in the Device\n' % missing[0]
+    return 0, ''.join(blocks[name] for name in (names or generators.vg_names(vgs))), ''
+
+
+def lssrc(args, state):
+    return 0, generators.lssrc_a(_env_int('FAKEAIX_SUBSYSTEMS', 100)), ''
+
+
+def lparstat(args, state):
+    return 0, generators.lparstat_i(), ''
+
+
+def _efixes(state):
+    if state.data['efixes'] is None:
+        return ['IV%05ds7a' % i for i in range(_env_int('FAKEAIX_EFIXES', 5))]
+    return state.data['efixes']
+
+
+def emgr(args, state):
+    flags, names = _options(args)
+    efixes = _efixes(state)
+    if 'l' in flags:
+        out = []
+        for i, label in enumerate(efixes):
+            out.append('+' + '-' * 77 + '+\nEFIX ID: %d\nEFIX LABEL: %s\n' % (i + 1, label) + '+' + '-' * 77 + '+\n')
+        return 0, ''.join(out), ''
+    if 'p' in flags:
+        return 0, 'PREVIEW\n', ''
+    if 'r' in flags:
+        for name in names:
+            if name not in efixes:
+                return 1, '', 'emgr: 0645-007 efix %s is not installed.\n' % name
+        state.data['efixes'] = [label for label in efixes if label not in names]
+    elif 'e' in flags:
+        state.data['efixes'] = efixes + [os.path.basename(name).split('.', 1)[0] for name in names]
+    state.save()
+    return 0, '', ''
+
+
+def _showres(state):
+    """
+    nimclient -o showres output of the lpp_source, which holds the installed level
+    and an update of every fileset
+    """
+    out = []
+    for line in _lpp_lines(state):
+        fields = line.split(':')
+        if fields[6] == 'R':
+            name = fields[0]
+            out.append('  %-66s ALL  @@R:%s _all_filesets' % (name, name))
+            for level in (fields[2], _next_level(fields[2])):
+                out.append('  @@R:%s-%s %s' % (name, level, level))
+        else:
+            fileset = fields[1]
+            out.append('  %-66s ALL  @@I:%s _all_filesets' % (fileset, fileset))
+            for level in (fields[2], _next_level(fields[2])):
+                out.append('  + %-9s %-56s @@I:%s %s' % (level, fields[7][:56], fileset, level))
+        out.append('')
+    return '\n'.join(out) + '\n'
+
+
+def nimclient(args, state):
+    flags, names = _options(args)
+    attributes = _attributes(args)
+    if 'l' in flags:
+        name = names[-1] if names else ''
+        return 0, '%s:\n   class       = resources\n   type        = lpp_source\n' % name, ''
+    operation = args[args.index('-o') + 1] if '-o' in args else ''
+    if operation == 'showres':
+        return 0, _showres(state), ''
+    if operation == 'cust':
+        current = dict((line.split(':')[1], line.split(':')[2]) for line in _lpp_lines(state))
+        if attributes.get('fixes') == 'update_all':
+            filesets = list(current)
+        else:
+            filesets = attributes.get('filesets', '').split()
+        for fileset in filesets:
+            if fileset in current:
+                state.data['levels'][fileset] = _next_level(current[fileset])
+        state.save()
+        return 0, 'Installation Summary\n', ''
+    return 0, '', ''
+
+
+def lsitab(args, state):
+    if args and args[0] in state.data['inittab']:
+        return 0, state.data['inittab'][args[0]] + '\n', ''
+    return 1, '', ''
+
+
+def mkitab(args, state):
+    entry = args[-1]
+    state.data['inittab'][entry.split(':')[0]] = entry
+    state.save()
+    return 0, '', ''
+
+
+def chitab(args, state):
+    return mkitab(args, state)
+
+
+def rmitab(args, state):
+    state.data['inittab'].pop(args[-1], None)
+    state.save()
+    return 0, '', ''
+
+
+def run(name, args):
+    """
+    runs the fake command name with args and returns the rc, stdout and stderr,
+    after the latency and with the failures of the environment
+    """
+    log = os.environ.get('FAKEAIX_LOG')
+    if log:
+        with open(log, 'a') as f:
+            f.write(' '.join([name] + args) + '\n')
+    latency = os.environ.get('FAKEAIX_LATENCY_' + name.upper(), os.environ.get('FAKEAIX_LATENCY', '0'))
+    time.sleep(float(latency))
+    if name in os.environ.get('FAKEAIX_HANG', '').split(','):
+        while True:
+            time.sleep(3600)
+    for failure in os.environ.get('FAKEAIX_FAIL', '').split(','):
+        command, sep, rc = failure.partition(':')
+        if command == name:
+            return int(rc or 1), '', '%s: failure injected by FAKEAIX_FAIL\n' % name
+    return globals()[name](args, State())
+
+
+def install(bindir):
+    """
+    writes a wrapper for every command to bindir, which runs this script with the current python
+    """
+    if not os.path.isdir(bindir):
+        os.makedirs(bindir)
+    for name in COMMANDS:
+        path = os.path.join(bindir, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\nexec "%s" "%s" %s "$@"\n' % (sys.executable, os.path.abspath(__file__), name))
+        os.chmod(path, 0o755)
+
+
+def main(argv):
+    name = os.path.basename(argv[0])
+    args = argv[1:]
+    if name not in COMMANDS:
+        if not args:
+            sys.stderr.write('usage: fakeaix.py install <dir> | <command> [args]\n')
+            return 2
+        name, args = args[0], args[1:]
+    if name == 'install':
+        install(args[0])
+        return 0
+    if name not in COMMANDS:
+        sys.stderr.write('fakeaix.py: unknown command %s\n' % name)
+        return 2
+    rc, out, err = run(name, args)
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    return rc
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
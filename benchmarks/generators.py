@@ -0,0 +1,189 @@
+#
+# Generators for synthetic AIX command output at fleet sizes.
+# The output follows the format of the real commands, the values are made up
+# but repeat the way they do on a real host (levels, states, descriptions).
+# Every generator takes a count and a seed, so a run is reproducible.
+#
+import random
+
+LSLPP_HEADER = ('#Package Name:Fileset:Level:State:PTF Id:Fix State:Type:Description:'
+                'Destination Dir.:Uninstaller:Message Catalog:Message Set:Message Number:'
+                'Parent:Automatic:EFIX Locked:Install Path:Build Date')
+LSFS_HEADER = '#MountPoint:Device:Vfs:Nodename:Type:Size:Options:AutoMount:Acct'
+LSSRC_HEADER = 'Subsystem         Group            PID          Status '
+
+PACKAGES = ('bos', 'bos.net', 'devices.pciex', 'devices.vdevice', 'X11', 'perl', 'rsct',
+            'openssh', 'openssl', 'xlC', 'Java8_64', 'printers', 'bos.adt', 'csm', 'sysmgt')
+LEVELS = ('7.1.4.30', '7.1.4.31', '7.1.4.0', '7.1.5.15', '6.1.9.100', '1.0.2.1100', '13.1.3.3')
+RPMS = ('bash', 'curl', 'gettext', 'glib2', 'libgcc', 'openssl', 'python', 'readline', 'zlib', 'wget')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+GROUPS = ('tcpip', 'spooler', 'nfs', 'rsct', 'ras', 'nimclient', 'caa', 'iconv', '')
+
+
+def lslpp_Lc(filesets, rpms=None, seed=1):
+    """
+    lslpp -Lc output with filesets installp filesets and rpms RPMs (default a tenth of filesets)
+    """
+    rnd = random.Random(seed)
+    if rpms is None:
+        rpms = filesets // 10
+    lines = [LSLPP_HEADER]
+    for i in range(filesets):
+        package = PACKAGES[i % len(PACKAGES)]
+        fileset = '%s.fs%05d.rte' % (package, i)
+        ptf = rnd.choice((' ', ' ', 'U8%05d' % i))
+        lines.append('%s:%s:%s: :%s:C: :%s fileset %d: : : : : : :0:0:/:%s' % (
+            package, fileset, rnd.choice(LEVELS), ptf, package, i % 50, rnd.choice(('1642', '1543', ''))))
+    for i in range(rpms):
+        name = '%s%d' % (RPMS[i % len(RPMS)], i)
+        level = '%d.%d-%d' % (rnd.randint(1, 9), rnd.randint(0, 20), rnd.randint(1, 5))
+        lines.append('%s:%s-%s:%s: : :C:R:%s library: :/bin/rpm -e %s: : : : :0: :/opt/freeware:'
+                     'Wed Jul 20 11:37:51 CDT 2016' % (name, name, level, level, name, name))
+    return '\n'.join(lines) + '\n'
+
+
+def lsfs_c(filesystems, seed=1):
+    """
+    lsfs -c output with filesystems jfs2 filesystems
+    """
+    rnd = random.Random(seed)
+    lines = [LSFS_HEADER]
+    for i in range(filesystems):
+        lines.append('/data/fs%05d:/dev/fslv%05d:jfs2::%s:%d:rw:yes:no' % (
+            i, i, rnd.choice(('', 'db', 'app')), rnd.randint(1, 4096) * 262144))
+    return '\n'.join(lines) + '\n'
+
+
+def mount(mounts, nfs=None, seed=1):
+    """
+    mount output with mounts local mounts and nfs nfs mounts (default a twentieth of mounts)
+    """
+    rnd = random.Random(seed)
+    if nfs is None:
+        nfs = mounts // 20
+    lines = ['  node       mounted        mounted over    vfs       date        options      ',
+             '-------- ---------------  ---------------  ------ ------------ --------------- ']
+    for i in range(mounts):
+        lines.append('         /dev/fslv%05d     /data/fs%05d     jfs2   %s %02d %02d:%02d rw,log=INLINE ' % (
+            i, i, rnd.choice(MONTHS), rnd.randint(1, 28), rnd.randint(0, 23), rnd.randint(0, 59)))
+    for i in range(nfs):
+        lines.append('nfssrv%02d /export/share%04d /nfs/share%04d  nfs3   %s %02d %02d:%02d soft,intr ' % (
+            i % 10, i, i, rnd.choice(MONTHS), rnd.randint(1, 28), rnd.randint(0, 23), rnd.randint(0, 59)))
+    return '\n'.join(lines) + '\n'
+
+
+def vg_names(vgs):
+    return ['rootvg'] + ['datavg%03d' % i for i in range(1, vgs)]
+
+
+def lsvg_p(vgs, pvs_per_vg=4, seed=1):
+    """
+    lsvg -o | xargs lsvg -p output for vgs volume groups
+    """
+    rnd = random.Random(seed)
+    lines = []
+    disk = 0
+    for vg in vg_names(vgs):
+        lines.append('%s:' % vg)
+        lines.append('PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION')
+        for i in range(pvs_per_vg):
+            total = rnd.choice((399, 400, 799, 1598))
+            lines.append('hdisk%-12d active            %-12d%-12d00..00..00..00..%02d' % (
+                disk, total, rnd.randint(0, total), rnd.randint(0, 99)))
+            disk += 1
+    return '\n'.join(lines) + '\n'
+
+
+def lsvg(vgs, seed=1):
+    """
+    lsvg -o | xargs lsvg output for vgs volume groups
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for vg in vg_names(vgs):
+        pp_size = rnd.choice((32, 64, 128, 256))
+        lines.extend([
+            'VOLUME GROUP:       %-25sVG IDENTIFIER:  00f62c6300004c00000001%010x' % (vg, rnd.getrandbits(40)),
+            'VG STATE:           active                   PP SIZE:        %d megabyte(s)' % pp_size,
+            'VG PERMISSION:      read/write               TOTAL PPs:      1598 (%d megabytes)' % (1598 * pp_size),
+            'MAX LVs:            256                      FREE PPs:       %d (%d megabytes)' % (117, 117 * pp_size),
+            'LVs:                12                       USED PPs:       1481 (%d megabytes)' % (1481 * pp_size),
+            'OPEN LVs:           11                       QUORUM:         2 (Enabled)',
+            'TOTAL PVs:          4                        VG DESCRIPTORS: 4',
+            'STALE PVs:          0                        STALE PPs:      0',
+            'ACTIVE PVs:         4                        AUTO ON:        yes',
+            'MAX PPs per VG:     32512',
+            'MAX PPs per PV:     1016                     MAX PVs:        32',
+            'LTG size (Dynamic): 256 kilobyte(s)          AUTO SYNC:      no',
+            'HOT SPARE:          no                       BB POLICY:      relocatable',
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+def lssrc_a(subsystems, seed=1):
+    """
+    lssrc -a output with subsystems subsystems, the columns are fixed width
+    """
+    rnd = random.Random(seed)
+    lines = [LSSRC_HEADER]
+    for i in range(subsystems):
+        if rnd.random() < 0.4:
+            lines.append(' %-17s%-16s%-14s%s' % ('subsys%04d' % i, rnd.choice(GROUPS), rnd.randint(100000, 9999999), 'active'))
+        else:
+            lines.append(' %-17s%-30s%s' % ('subsys%04d' % i, rnd.choice(GROUPS), 'inoperative'))
+    return '\n'.join(lines) + '\n'
+
+
+def lparstat_i(seed=1):
+    """
+    lparstat -i output, which has a fixed number of lines
+    """
+    rnd = random.Random(seed)
+    items = [
+        ('Node Name', 'rn12402'), ('Partition Name', 'rn12402'), ('Partition Number', '16'),
+        ('Type', 'Shared-SMT-4'), ('Mode', 'Uncapped'), ('Entitled Capacity', '0.40'),
+        ('Partition Group-ID', '32784'), ('Shared Pool ID', '0'), ('Online Virtual CPUs', '4'),
+        ('Maximum Virtual CPUs', '16'), ('Minimum Virtual CPUs', '1'),
+        ('Online Memory', '%d MB' % rnd.choice((8192, 16384, 65536))),
+        ('Maximum Memory', '128 GB'), ('Minimum Memory', '1024 MB'),
+        ('Variable Capacity Weight', '1'), ('Minimum Capacity', '0.10'), ('Maximum Capacity', '16.00'),
+        ('Capacity Increment', '0.01'), ('Maximum Physical CPUs in system', '64'),
+        ('Active Physical CPUs in system', '23'), ('Active CPUs in Pool', '23'),
+        ('Shared Physical CPUs in system', '23'), ('Maximum Capacity of Pool', '2300'),
+        ('Entitled Capacity of Pool', '895'), ('Unallocated Capacity', '0.00'),
+        ('Physical CPU Percentage', '10.00%'), ('Unallocated Weight', '0'), ('Memory Mode', 'Dedicated'),
+        ('Total I/O Memory Entitlement', '-'), ('Variable Memory Capacity Weight', '-'),
+        ('Memory Pool ID', '-'), ('Physical Memory in the Pool', '-'), ('Hypervisor Page Size', '-'),
+        ('Unallocated Variable Memory Capacity Weight', '-'), ('Unallocated I/O Memory entitlement', '-'),
+        ('Memory Group ID of LPAR', '-'), ('Desired Virtual CPUs', '4'), ('Desired Memory', '8192 MB'),
+        ('Desired Variable Capacity Weight', '1'), ('Desired Capacity', '0.40'),
+        ('Target Memory Expansion Factor', '-'), ('Target Memory Expansion Size', '-'),
+        ('Power Saving Mode', 'Disabled'), ('Sub Processor Mode', '-'),
+    ]
+    return '\n'.join('%-36s: %s' % item for item in items) + '\n'
+
+
+def niminfo(hosts=3):
+    """
+    /etc/niminfo of a standalone nim client with hosts entries in NIM_HOSTS
+    """
+    nim_hosts = ' '.join('172.27.8.%d:host%d.testlab.intranet' % (i, i) for i in range(hosts))
+    return '\n'.join([
+        '#------------------ Network Install Manager ---------------',
+        '# warning - this file contains NIM configuration information',
+        '#       and should only be updated by NIM',
+        'export NIM_NAME=rn12402pl',
+        'export NIM_HOSTNAME=rn12402pl.itc.testlab.intranet',
+        'export NIM_CONFIGURATION=standalone',
+        'export NIM_MASTER_HOSTNAME=rn100pgpl.itc.testlab.intranet',
+        'export NIM_MASTER_PORT=1058',
+        'export NIM_REGISTRATION_PORT=1059',
+        'export NIM_SHELL="nimsh"',
+        'export NIM_MASTERID=00F62C634C00',
+        'export NIM_FIPS_MODE=0',
+        'export NIM_BOS_IMAGE=/SPOT/usr/sys/inst.images/installp/ppc/bos',
+        'export NIM_BOS_FORMAT=rte',
+        'export NIM_HOSTS=" 127.0.0.1:loopback:localhost  %s "' % nim_hosts,
+        'export NIM_MOUNTS=""',
+        'export ROUTES=" default:0:172.27.8.1 "',
+    ]) + '\n'
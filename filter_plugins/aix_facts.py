@@ -0,0 +1,93 @@
+#
+# Filters for the facts of AIX_facts
+#
+# aix_records expands a fact gathered with fact_format: columnar back to a list of
+# dictionaries, one per row. A list is returned as it is, so a play can use the
+# filter whatever the fact_format of the gather was.
+#
+#   - debug:
+#       var: item.Level
+#     with_items: "{{ lpps | aix_records }}"
+#     when: item.Fileset == 'openssl.base'
+#
+# aix_version_compare and aix_latest_version compare LPP levels and RPM versions
+# like installp and rpm do, see module_utils/aix/version.py, which a plain
+# version test gets wrong for 1.9-10 and 1.9-9.
+#
+#   - debug:
+#       msg: openssl.base is older than 1.0.2.1100
+#     when: (lpps_by_fileset['openssl.base'] | aix_version_compare('1.0.2.1100')) < 0
+#
+import os
+
+from ansible.errors import AnsibleFilterError
+
+try:
+    from itertools import izip
+except ImportError:
+    izip = zip
+
+VERSION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'module_utils', 'aix', 'version.py')
+
+# why version.py could not be loaded, the version filters fail with it
+version_error = None
+
+try:
+    from ansible.module_utils.aix import version
+except ImportError:
+    # the module_utils next to the playbook are no package on the controller
+    try:
+        try:
+            import importlib.util
+        except ImportError:
+            import imp
+            version = imp.load_source('aix_version', VERSION_PATH)
+        else:
+            _spec = importlib.util.spec_from_file_location('aix_version', VERSION_PATH)
+            version = importlib.util.module_from_spec(_spec)
+            _spec.loader.exec_module(version)
+    except (IOError, OSError) as e:
+        version = None
+        version_error = "could not load %s for the aix version filters: %s" % (VERSION_PATH, e)
+
+
+def _version():
+    """
+    Internal function that returns the version module, or raises AnsibleFilterError
+    """
+    if version is None:
+        raise AnsibleFilterError(version_error)
+    return version
+
+
+def aix_records(fact):
+    """
+    converts {'columns': [...], 'rows': [[...], ...]} to a list of dictionaries
+    """
+    if isinstance(fact, dict) and 'columns' in fact and 'rows' in fact:
+        columns = fact['columns']
+        return [dict(izip(columns, row)) for row in fact['rows']]
+    return fact
+
+
+def aix_version_compare(a, b):
+    """
+    returns -1, 0 or 1 if the level or version a is older than, the same as or newer than b
+    """
+    return _version().compare_versions(str(a), str(b))
+
+
+def aix_latest_version(versions):
+    """
+    returns the latest of a list of levels or versions, None for an empty list
+    """
+    versions = _version().sort_versions(str(v) for v in versions)
+    return _version().latest_version(versions)
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {'aix_records': aix_records,
+                'aix_version_compare': aix_version_compare,
+                'aix_latest_version': aix_latest_version}
@@ -119,24 +119,21 @@ import tempfile
 import shutil
 import glob
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.aix.cache import CACHE_DIR
+from ansible.module_utils.aix.commands import get_bin_path
+from ansible.module_utils.aix.niminfo import NIMINFO, read_niminfo
+from ansible.module_utils.aix.oslevel import oslevel_s
 
 # end import modules
 
 
 def nim_master(module):
-    file = '/etc/niminfo'
-
     try:
-        if os.path.exists(file):
-            niminfo = dict(
-                (k.strip(), v.strip(' "\n')) for k, v in (
-                    line.split(
-                        ' ', 1)[1].split(
-                        '=', 1) for line in (
-                        (l for l in open(
-                            file, 'r') if not l.startswith('#')))))
+        niminfo = read_niminfo()
     except IOError as e:
-        module.fail_json(msg="could not determine NIM_MASTER", rc=rc, err=e)
+        module.fail_json(msg="could not determine NIM_MASTER", rc=1, err=str(e))
+    if 'NIM_MASTER_HOSTNAME' not in niminfo:
+        module.fail_json(msg="could not determine NIM_MASTER, no NIM_MASTER_HOSTNAME in " + NIMINFO, rc=1)
     return niminfo['NIM_MASTER_HOSTNAME']
 
 
@@ -151,7 +148,7 @@ def efixes_installed(module):
     # deliver the efixes
 
     allefixesinstalled = []
-    emgr = module.get_bin_path('emgr')
+    emgr = get_bin_path(module, 'emgr')
     (rc, out, err) = module.run_command("%s %s" % (emgr, '-lv2'))
     if rc != 0:
         module.fail_json(
@@ -171,7 +168,7 @@ def nfs_mount(module):
     nfsserver = module.params['nfs_server']
     nfsshare = module.params['nfs_share']
     nfs_string = nfsserver + ":" + nfsshare
-    mount = module.get_bin_path('mount')
+    mount = get_bin_path(module, 'mount')
     (rc, err, out) = module.run_command("%s %s %s %s" %
                                         (mount, '-o soft', nfs_string, dirpath))
     if rc != 0:
@@ -184,7 +181,7 @@ def nfs_mount(module):
 
 
 def nfs_umount(module, path):
-    umount = module.get_bin_path('umount')
+    umount = get_bin_path(module, 'umount')
     (rc, err, out) = module.run_command("%s %s" % (umount, path))
     if rc != 0:
         err = "ERROR: could not unmount" + path + err
@@ -215,7 +212,7 @@ def efixes_at_share(module, path):
 def remove_efixes(module, list):
     changed = False
     msg = []
-    emgr = module.get_bin_path('emgr')
+    emgr = get_bin_path(module, 'emgr')
     for efix in list:
         rc = 0
         if module.check_mode:
@@ -238,7 +235,7 @@ def remove_efixes(module, list):
 def install_efixes(module, path, list):
     changed = False
     msg = []
-    emgr = module.get_bin_path('emgr')
+    emgr = get_bin_path(module, 'emgr')
     for efix in list:
         # because you can only install efixes from the filename,
         # the filename has to be found out
@@ -325,13 +322,8 @@ def main():
         # /export/nim/aix<OSLEVEL><TL>-<SP>/efix
         if module.params['nfs_share'] is None:
             # get oslevel -s and parse the output to get oslevel, TL and SP
-            oslevel = module.get_bin_path('oslevel')
-            (rc, out, err) = module.run_command("%s %s" % (oslevel, '-s'))
-            if rc != 0:
-                module.fail_json(
-                    msg='ERROR: Could not determine the oslevel',
-                    err=err,
-                    rc=rc)
+            # AIX_facts with oslevel_cache keeps the output as long as the software does not change
+            out = oslevel_s(module, CACHE_DIR, store=False)
             osver = out[:2]
             ostl = out[5:7]
             ossp = out[7:10]
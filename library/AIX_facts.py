@@ -14,11 +14,13 @@ short_description:
     oslevel
     build
     lpps
+    lpps_by_fileset, the level of every fileset by its name, of an RPM by its name without the version
     filesystems
     mounts
     vgs
     lssrc
     niminfo
+    lparstat
 '''
 
 RETURN = '''
@@ -60,6 +62,12 @@ ansible_facts: {
     ]
     },
 
+    {
+    "lpps_by_fileset": {
+        "BESClient": "9.5.4.38",
+    }
+    },
+
     {
     "filesystems": [
         {
@@ -183,8 +191,176 @@ ansible_facts: {
     },
 }
 
-opions:
-  there are no options
+options:
+  gather_subset:
+    description:
+      - Restrict the facts to the given collectors, which are the fact names above.
+        Possible values are C(all), C(min) and the name of a collector.
+        A name can be prefixed with C(!) to exclude it, C(!all) leaves only the min subset.
+        The min subset (build and niminfo) only reads files and is always gathered unless C(!min) is given.
+    default: ['all']
+    type: list
+  exclude:
+    description: Names of collectors which should not run, on top of gather_subset.
+    default: []
+    type: list
+  cache:
+    description:
+      - Keep the output of the oslevel, lpps and filesystems collectors in a cache on the host.
+        An entry is used as long as the ODM, rpm and efix databases (oslevel and lpps) or
+        /etc/filesystems (filesystems) did not change and it is not older than cache_ttl,
+        so these collectors do not run a command at all.
+      - The module returns facts_cache with a hit or a miss for every cached collector.
+    default: false
+    type: bool
+  cache_dir:
+    description: Directory on the host which holds the cache.
+    default: /var/adm/ansible/AIX_facts
+    type: path
+  cache_ttl:
+    description: Maximum age in seconds of a cache entry.
+    default: 86400
+    type: int
+  lpps_method:
+    description:
+      - How the lpps fact is built. C(lslpp) runs lslpp -Lc.
+        C(odm) reads the product class of the usr and share ODM with odmget and the rpm database with rpm -qa,
+        which is much faster on hosts with thousands of filesets.
+      - With C(odm) the columns which are not in the ODM (Destination_Dir., Message_*, Parent,
+        EFIX_Locked, Install_Path and Build_Date of the filesets) get their default value.
+    default: lslpp
+    choices: [ lslpp, odm ]
+  lpps_include:
+    description:
+      - Return only the lpps whose Fileset matches one of these patterns. A pattern is a glob,
+        f.i. C(openssl.*), or a regex when it starts with C(re:), f.i. C(re:bos\\.net\\..*).
+      - The filters are applied while the output of lslpp is parsed, so the records which are
+        left out are never kept.
+    default: []
+    type: list
+  lpps_types:
+    description: Return only the installp filesets (C(LPP)) or only the RPMs (C(RPM)).
+    default: []
+    type: list
+    choices: [ LPP, RPM ]
+  lpps_fields:
+    description:
+      - Return only these columns of the lpps, f.i. C([ Fileset, Level, State ]).
+        Fileset and Level are always returned, lpps_by_fileset and since need them.
+      - With lpps_include or lpps_types and oslevel_method C(derive), the oslevel is not
+        taken from the lpps, as bos.rte may be left out.
+    default: []
+    type: list
+  mount_timeout:
+    description:
+      - Seconds to wait for the size of a mounted filesystem. A mount which does not answer in time,
+        f.i. a stale nfs or a hung jfs2 mount, gets size_total and size_available null and stale true
+        instead of blocking the gather.
+    default: 5
+    type: float
+  profile:
+    description:
+      - Return facts_profile next to ansible_facts, with the total wall time of the gather and
+        for every collector its wall time, the number of commands it ran, the bytes
+        these commands wrote to stdout and the number of records it returned.
+      - The counters are kept anyway, so this costs nothing extra.
+    default: false
+    type: bool
+  fact_format:
+    description:
+      - How the lpps, filesystems and lssrc facts are returned. C(records) returns a list
+        with a dictionary per record.
+      - C(columnar) returns a dictionary with the sorted names of the columns in columns and
+        a list of values per record in rows, so the names are sent once instead of once per record,
+        which makes the result of a host with thousands of filesets several times smaller.
+        The aix_records filter in filter_plugins expands it to a list of dictionaries again.
+      - lpps_by_fileset is the same in both formats.
+    default: records
+    choices: [ records, columnar ]
+  since:
+    description:
+      - Return the lpps, filesystems and mounts facts as a delta. After every gather with since
+        a snapshot of these facts is kept in cache_dir, named after the fingerprint of their content.
+      - If since is the fingerprint of a snapshot on the host, f.i. the one returned by the
+        previous gather, these facts are left out of ansible_facts and facts_delta holds
+        for each of them the records which were added, the keys of the records which were removed
+        and the records which changed. lpps_by_fileset is left out as well.
+      - Otherwise, f.i. with since '' on the first gather, the facts are returned complete.
+      - facts_delta.fingerprint is the fingerprint to give as since on the next gather,
+        facts_delta.since is null when a complete result was returned.
+      - The size of a local mount changes with every write, so a busy mount is in changed on every gather.
+    type: str
+  oslevel_cache:
+    description:
+      - Keep the output of oslevel -s, which walks the whole software inventory, in cache_dir as long as
+        the ODM, rpm and efix databases do not change. There is no cache_ttl, a change of the software
+        is the only reason for oslevel -s to change. AIX_efix uses the same entry when there is one.
+    default: false
+    type: bool
+  oslevel_method:
+    description:
+      - How the oslevel fact is built. C(oslevel) runs oslevel -s, or takes it from the cache.
+      - C(derive) derives OS_Ver, TL and oslevel_r (like oslevel -r) from the level of bos.rte,
+        which is taken from the lpps fact when it is gathered, otherwise from lslpp -Lc bos.rte.
+        The service pack and build date can not be derived from a fileset level, so the fact has
+        no SP, BUILD_DATE and oslevel_s, and derived is true.
+    default: oslevel
+    choices: [ oslevel, derive ]
+  batch:
+    description:
+      - Run the commands of all selected collectors which are not cached in one /bin/sh, in parallel,
+        instead of a fork of the module for every command. The collectors parse their own part
+        of the combined output. This saves a fork of the python process per command, which is
+        expensive on AIX.
+      - The output of a command is read as a whole instead of streamed, so a gather of
+        the lpps of a large host takes more memory.
+      - facts_profile has the time of the batch as the collector batch.
+    default: false
+    type: bool
+  collector_timeout:
+    description:
+      - Seconds every collector may take. The commands of a collector which are still running then are
+        killed with their whole process group, f.i. an lsvg on a dead disk or an lssrc on a busy
+        SRC daemon, and the collector fails with timed_out in its error.
+      - With batch the batch gets collector_timeout as well, a command which is killed in the batch
+        fails its collector.
+      - 0 disables the timeout.
+    default: 300
+    type: float
+  partial_facts:
+    description:
+      - Return the facts of the collectors which succeeded when other collectors failed or timed out.
+        facts_errors holds the error of every collector which failed, by its name.
+      - With false the module fails when a collector fails, like before.
+    default: true
+    type: bool
+  agent:
+    description:
+      - Get the facts from the facts agent on the host, see the aix_facts_agent module, instead of
+        running the collectors. The agent keeps the facts of all collectors up to date, so this
+        returns within milliseconds.
+      - The collectors the agent has no facts of, and all collectors when the agent does not run,
+        are gathered by the module itself.
+      - The lpps of the agent are used when it has the same lpps_method, lpps_include, lpps_types and
+        lpps_fields are applied to them. The other options of the collectors are the ones of the agent.
+      - The module returns facts_agent with running and the age in seconds of every fact of the agent.
+    default: false
+    type: bool
+  agent_socket:
+    description: The UNIX socket of the facts agent.
+    default: /var/adm/ansible/AIX_facts/agent.sock
+    type: path
+  fact_file:
+    description:
+      - Write the gathered facts to this file as well, f.i. /etc/ansible/facts.d/aix.fact,
+        so setup returns them as ansible_local.aix without running a command.
+        The file is written to a temporary file which is renamed, setup never reads a partial file.
+      - The file holds the facts in the records format with lpps_by_fileset, facts_errors and
+        generated_at, the time of the gather in seconds since the epoch, so a play can tell how old it is.
+        With since the complete facts are written.
+      - The module returns facts_file with the path and generated_at.
+      - aix_facts_agent can keep the file up to date in the background.
+    type: path
 '''
 
 EXAMPLES = '''
@@ -215,297 +391,340 @@ EXAMPLES = '''
       when:
         - '"openssl.base" in "{{ item.Fileset|lower }}" '
 
+    - name: prints the version of openssl.base without a loop over all lpps
+      debug:
+        var: lpps_by_fileset['openssl.base']
+      when: "'openssl.base' in lpps_by_fileset"
+
+    - name: only gather the oslevel and the mounts
+      AIX_facts:
+        gather_subset:
+          - '!all'
+          - oslevel
+          - mounts
+
+    - name: gather everything except the lpps and the vgs
+      AIX_facts:
+        exclude:
+          - lpps
+          - vgs
+
+    - name: gather the facts, reuse the oslevel, lpps and filesystems when nothing changed
+      AIX_facts:
+        cache: true
+
+    - name: gather the software, with the os version and TL derived from it instead of running oslevel -s
+      AIX_facts:
+        gather_subset:
+          - '!all'
+          - lpps
+          - oslevel
+        oslevel_method: derive
+
+    - name: run the commands of all collectors in one shell
+      AIX_facts:
+        batch: true
+
+    - name: find out which collector makes the gather slow
+      AIX_facts:
+        profile: true
+      register: aix_facts
+
+    - debug:
+        var: aix_facts.facts_profile
+
+    - name: gather the large facts in the compact columnar format
+      AIX_facts:
+        fact_format: columnar
+
+    - name: prints the version of openssl.base from the columnar lpps
+      debug:
+        var: item.Level
+      with_items: "{{ lpps | aix_records }}"
+      when: item.Fileset == 'openssl.base'
+
+    - name: read the facts of the fact file, the min subset has ansible_local and ansible_date_time
+      setup:
+        gather_subset: '!all'
+
+    - name: gather the facts again when the fact file is older than an hour
+      AIX_facts:
+        fact_file: /etc/ansible/facts.d/aix.fact
+      when: ansible_local.aix is not defined or
+            (ansible_date_time.epoch | int) - ansible_local.aix.generated_at > 3600
+
+    - name: gather the level and state of the openssl and openssh filesets only
+      AIX_facts:
+        gather_subset:
+          - lpps
+        lpps_include:
+          - openssl.*
+          - openssh.*
+        lpps_types:
+          - LPP
+        lpps_fields:
+          - Fileset
+          - Level
+          - State
+
 '''
 
 # import modules needed
-import sys
-import shlex
 import os
-import platform
-import re
-import itertools
-import commands
-
-try:
-    import json
-except ImportError:
-    import simplejson as json
+import time
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.aix.agent import AGENT_SOCKET, agent_request
+from ansible.module_utils.aix.cache import CACHE_DIR
+from ansible.module_utils.aix.engine import run_collectors
+from ansible.module_utils.aix.delta import make_delta
+from ansible.module_utils.aix.factsd import write_fact_file
+from ansible.module_utils.aix.parsers import records_to_columns
 
 # end import modules
+
 # start defining the functions
 
 
-# Internal functions
-def _convert_out_to_list(out):
-    """
-    Internal function to convert colon separtated output to a list of dictionaries. 
-    The first line of the out contains the keys, and starts with an '#' 
-    F.i.
-        #MountPoint:Device:Vfs:Nodename:Type:Size:Options:AutoMount:Acct
-        /:/dev/hd4:jfs2::bootfs:524288:rw:yes:no
-        /usr:/dev/hd2:jfs2::bootfs:8912896:rw:yes:no
-    """
-    lijst = []
-    for line in out.splitlines():
-        if re.match('^#', line):
-             line = line[1:]
-             line = line.replace(' ', '_')
-             keys = line.split(":")
-        else:
-            values = line.split(":")
-            adict = dict(itertools.izip(keys,values))
-            lijst.append(adict)
-    return lijst
+# the collectors are imported when they are selected, so a gather_subset only
+# loads the parsers it needs. Every loader imports its collector with a literal
+# import, because AnsiballZ only ships the module_utils it finds in the source.
+def _load_oslevel():
+    from ansible.module_utils.aix import oslevel
+    return oslevel
 
 
-def _get_mount_size_facts(mountpoint):
-    """
-    Internal module to determine the filesystem size and free size in bites 
-    The input is teh mountpoint
-    """
-    size_total = None
-    size_available = None
-    try:
-        statvfs_result = os.statvfs(mountpoint)
-        size_total = statvfs_result.f_frsize * statvfs_result.f_blocks
-        size_available = statvfs_result.f_frsize * (statvfs_result.f_bavail)
-    except OSError:
-        pass
-    return size_total, size_available
-
-
-def get_oslevel(module):
-    """
-    get the oslevel function delivers oslvel -s output
-    <OS Ver>-<TL>-<SP>-<BUILD DATE>
-    as wel OV_Version, the tecnology level, TL, the Servicepack, SP and the BUILD_DATE, 
-    """
-    rc, out, err = module.run_command(["/usr/bin/oslevel", "-s"])
-    if rc !=0:
-        module.fail_json(msg="could not determine oslevel", rc=rc, err=err) 	
-    lijst = {'oslevel_s' : out.strip('\n') }
-    keys=('OS_Ver', 'TL', 'SP', 'BUILD_DATE')
-    values = out.split('-')
-    v_stript = [v.rstrip('0\n') for v in values]
-    adict = dict(itertools.izip(keys,v_stript))
-    lijst.update(adict)
+def _load_build():
+    from ansible.module_utils.aix import build
+    return build
 
-    return lijst
 
+def _load_lpps():
+    from ansible.module_utils.aix import lpps
+    return lpps
 
-def get_build(module):
-    """
-    reads the /var/adm/autoinstall/etc/BUILD to determine the BUILS, 
-    if this fails, it reads the /etc/BUILD
-    the output is the BUILD version
-    """
-    build = {}
-    org_file = '/var/adm/autoinstall/etc/BUILD'
-    copy_file = '/etc/BUILD'
-    try: 
-        if os.path.exists(org_file):
-            build = ''.join([line.strip() for line in open(org_file, 'r')])
-    except IOError as e:
-	if os.path.exists(copy_file):
-            build = ''.join([line.strip() for line in open(copy_file, 'r')])
-    except IOError as e:
-	    module.fail_json(msg="could not determine BUILD", rc=rc, err=e)
-    return build
 
-def get_lpps(module):
-    """
-    runs the lslpp -Lc and delivers the output to _convert_out_to_list 
-    for creating the lpps fact
-    """
-    lpps = []
-    rc, out, err = module.run_command(["/usr/bin/lslpp", "-Lc"])
-    if rc !=0:
-         module.fail_json(msg="could not determine lslpp list", rc=rc, err=err)
-    return  _convert_out_to_list(out)
+def _load_filesystems():
+    from ansible.module_utils.aix import filesystems
+    return filesystems
 
-def get_filesystems(module):
-    """
-    runs the lsfs -c and delivers the output to _convert_out_to_list 
-    for creating the filesystems fact
-    """
-    filesystems = []
-    rc, out, err =  module.run_command(["/usr/sbin/lsfs", "-c"])
-    if rc !=0:
-         module.fail_json(msg="could not determine lsfs list", rc=rc, err=err)
-    return _convert_out_to_list(out)
 
-def get_mounts(module):
-    """
-    create a lists with mounted filesystems
-    it calls to _get_mount_size_facts to determine the size and free size
-    it outputs all mounts
-    """
-    mounts = []
-    # AIX does not have mtab but mount command is only source of info (or to use
-    # api calls to get same info)
-    rc, out, err = module.run_command("/usr/sbin/mount")
-    if rc !=0:
-        module.fail_json(msg="could not determine mounts", rc=rc, err=err)
-    else:
-        for line in out.splitlines():
-            fields = line.split()
-            if len(fields) != 0 and fields[0] != 'node' and fields[0][0] != '-' and re.match('^/.*|^[a-zA-Z].*|^[0-9].*', fields[0]):
-                if re.match('^/', fields[0]):
-                    # normal mount
-                    size_total, size_available = _get_mount_size_facts(fields[1])
-                    mounts.append({'mount': fields[1],
-                                   'device': fields[0],
-                                   'fstype' : fields[2],
-                                   'options': fields[6],
-                                   'size_total': size_total,
-				   'size_available': size_available,
-                                   'time': '%s %s %s' % ( fields[3], fields[4], fields[5])})
-                else:
-                    # nfs or cifs based mount
-                    # in case of nfs if no mount options are provided on command line
-                    # add into fields empty string...
-                    if len(fields) < 8: fields.append("")
-                    mounts.append({'mount': fields[2],
-                                   'device': '%s:%s' % (fields[0], fields[1]),
-                                   'fstype' : fields[3],
-                                   'options': fields[7],
-                                   'time': '%s %s %s' % ( fields[4], fields[5], fields[6])})
+def _load_mounts():
+    from ansible.module_utils.aix import mounts
     return mounts
 
-def get_vgs(module):
-    """
-    Get vg and pv Facts
-    $ lsvg |xargs lsvg -p
-    rootvg:
-    PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION
-    hdisk0            active            400         117         29..00..00..40..48
-    midwarevg:
-    PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION
-    hdisk1            active            400         3           00..00..00..00..03
-    altdiskvg:
-    PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION
-    hdisk2            active            399         399         80..80..79..80..80
-    """
 
-    lsvg_path = module.get_bin_path("lsvg")
-    xargs_path = module.get_bin_path("xargs")
-    cmd = "%s -o| %s %s -p" % (lsvg_path ,xargs_path,lsvg_path)
-    vgs = {}
-    if lsvg_path and xargs_path:
-        rc, out, err = module.run_command(cmd,use_unsafe_shell=True)
-	if rc !=0:
-            module.fail_json(msg="could not determine lsvg |xargs lsvg -p", rc=rc, err=err)
-        if rc == 0 and out:
-            for m in re.finditer(r'(\S+):\n.*FREE DISTRIBUTION(\n(\S+)\s+(\w+)\s+(\d+)\s+(\d+).*)+', out):
-                vgs[m.group(1)] = []
-                pp_size = 0
-                cmd = "%s %s" % (lsvg_path,m.group(1))
-                rc, out, err = module.run_command(cmd)
-                if rc == 0 and out:
-                    pp_size = re.search(r'PP SIZE:\s+(\d+\s+\S+)',out).group(1)
-                    for n in  re.finditer(r'(\S+)\s+(\w+)\s+(\d+)\s+(\d+).*',m.group(0)):
-                        pv_info = { 'pv_name': n.group(1),
-                                    'pv_state': n.group(2),
-                                    'total_pps': n.group(3),
-                                    'free_pps': n.group(4),
-                                    'pp_size': pp_size
-                                  }
-                        vgs[m.group(1)].append(pv_info)
+def _load_vgs():
+    from ansible.module_utils.aix import vgs
     return vgs
 
 
-def get_lssrc(module):
-    lijst = []
-    rc, out, err = module.run_command(["/usr/bin/lssrc", "-a"])
-    if rc !=0:
-        module.fail_json(msg="ERROR: Could not complete lssrc ", rc=rc, err=err)
-    firstline = True
-    for line in out.splitlines():
-        if firstline == True:
-            keys = line.split()
-            firstline = False
-        else:
-            # lssrc output is colomn formatted without specific separator, so use exact positions for each field!
-            values = [ line[0:18].strip() , line[18:34].strip() , line[34:48].strip() , line[48:60].strip() ]
-            adict = dict(itertools.izip(keys,values))
-            lijst.append(adict)
-    return lijst
-
-def get_niminfo(module):
-    file = '/etc/niminfo'
-
-    try:
-        if os.path.exists(file):
-	    '''
-	     the niminfo looks like:
-	     #------------------ Network Install Manager ---------------
-	     # warning - this file contains NIM configuration information
-	     #       and should only be updated by NIM
-	     export NIM_NAME=rn12402pl
-	     export NIM_HOSTNAME=rn12402pl.itc.testlab.intranet
-	     export NIM_CONFIGURATION=standalone
-	     export NIM_MASTER_HOSTNAME=rn100pgpl.itc.testlab.intranet
-	     export NIM_MASTER_PORT=1058
-	     export NIM_REGISTRATION_PORT=1059
-	     export NIM_SHELL="nimsh"
-	     export NIM_MASTERID=00F62C634C00
-	     export NIM_FIPS_MODE=0
-	     export NIM_BOS_IMAGE=/SPOT/usr/sys/inst.images/installp/ppc/bos
-	     export NIM_BOS_FORMAT=rte
-	     export NIM_HOSTS=" 127.0.0.1:loopback:localhost  172.27.8.43:rn12402pl.itc.testlab.intranet  172.27.8.18:rn100pgpl.itc.testlab.intranet "
-	     export NIM_MOUNTS=""
-	     export ROUTES=" default:0:172.27.8.1 "
-
-	     The next line will do 3 things
-             It opens the file and removes all lines string with '#' ((l for l in open(file, 'r') if not l.startswith('    #')))
-             it puts the output in line
-	     It splits that line into 2 blocks showing only the second and splits this into 2 block with '=' as separator line.split(' ', 1)[1].split('=')
-             the output is put into k anv v
-	     than it strips k and v and creates a dictionary from these dict((k.strip(), v.strip(' "\n'))
-	    '''
-            niminfo = dict((k.strip(), v.strip(' "\n')) for k, v in (line.split(' ', 1)[1].split('=', 1) for line in ((l for l in open(file, 'r') if not l.startswith('#')))))
-    except IOError as e:
-       module.fail_json(msg="could not read /etc/niminfo", rc=rc, err=e)
+def _load_lssrc():
+    from ansible.module_utils.aix import lssrc
+    return lssrc
+
+
+def _load_niminfo():
+    from ansible.module_utils.aix import niminfo
     return niminfo
 
-def get_lparstat(module):
-    lijst = []
-    adict={}
-    rc, out, err = module.run_command(["/usr/bin/lparstat", "-i"])
-    if rc !=0:
-        module.fail_json(msg="ERROR: could not complete lparstat -i", rc=rc, err=err)
-    for line in out.splitlines():
-        key, value = line.split(":")
-	key = key.strip().replace(' ', '_')
-	value = value.strip().split(" ")
-	value[0] = value[0].replace('%', '')
-	if len(value) == 2:
-	    if value[1] == 'GB':
-	        value[0] = float(value[0]) * 1024
-	adict[key] = value[0]
-    lijst.append(adict)
-    return lijst
-
-        
-                
-	    
+
+def _load_lparstat():
+    from ansible.module_utils.aix import lparstat
+    return lparstat
+
+
+# the collectors, the key is the name of the fact
+COLLECTORS = [
+    ('oslevel', _load_oslevel),
+    ('build', _load_build),
+    ('lpps', _load_lpps),
+    ('filesystems', _load_filesystems),
+    ('mounts', _load_mounts),
+    ('vgs', _load_vgs),
+    ('lssrc', _load_lssrc),
+    ('niminfo', _load_niminfo),
+    ('lparstat', _load_lparstat),
+]
+
+# collectors which only read a file, these are always gathered unless '!min' is given
+MIN_SUBSET = ('build', 'niminfo')
+
+# the list facts which are converted with fact_format columnar
+COLUMNAR_FACTS = ('lpps', 'filesystems', 'lssrc')
+
+
+def _select_collectors(module, gather_subset, exclude):
+    """
+    Internal function to select the collectors to run, with the same semantics as
+    the gather_subset of the setup module.
+    'all' selects all collectors, '!all' leaves only the min subset,
+    '!min' removes the min subset and '!<name>' removes a collector.
+    If only exclusions are given, all other collectors are selected.
+    The collectors in exclude are never selected.
+    It returns a list of (name, loader) tuples.
+    """
+    valid = set(name for name, loader in COLLECTORS)
+    selected = set()
+    excluded = set()
+    exclude_all = False
+    positive = False
+    for subset in gather_subset:
+        subset = subset.strip()
+        negate = subset.startswith('!')
+        name = subset.lstrip('!')
+        if name == 'all':
+            if negate:
+                exclude_all = True
+            else:
+                selected |= valid
+        elif name == 'min':
+            if negate:
+                excluded |= set(MIN_SUBSET)
+        elif name in valid:
+            if negate:
+                excluded.add(name)
+            else:
+                selected.add(name)
+        else:
+            module.fail_json(msg="ERROR: unknown gather_subset: %s, valid subsets are: all, min, %s" %
+                             (subset, ', '.join(sorted(valid))), rc=1)
+        if not negate:
+            positive = True
+    if not positive and not exclude_all:
+        selected |= valid
+    selected |= set(MIN_SUBSET)
+    for name in exclude:
+        if name not in valid:
+            module.fail_json(msg="ERROR: unknown collector in exclude: %s, valid collectors are: %s" %
+                             (name, ', '.join(sorted(valid))), rc=1)
+        excluded.add(name)
+    return [(name, loader) for name, loader in COLLECTORS
+            if name in selected and name not in excluded]
+
+
+def _ask_agent(module, names):
+    """
+    Internal function that gets the facts of the collectors in names from the agent.
+    It returns the facts and errors the agent had and the facts_agent result, with the
+    age of every fact the agent answered, or running false when it did not answer.
+    The lpps of the agent are filtered like the lpps of a gather, and are only used when the
+    agent builds them with the same lpps_method.
+    """
+    answer = agent_request(module.params['agent_socket'], names)
+    if answer is None:
+        return {}, {}, {'running': False, 'age': {}}
+    facts = answer.get('facts', {})
+    errors = answer.get('errors', {})
+    age = answer.get('age', {})
+    if 'lpps' in names and answer.get('params', {}).get('lpps_method') != module.params['lpps_method']:
+        for result in (facts, errors, age):
+            result.pop('lpps', None)
+    if facts.get('lpps'):
+        from ansible.module_utils.aix.lpps import select_lpps
+        facts['lpps'] = list(select_lpps(module, facts['lpps']))
+    return facts, errors, {'running': True, 'age': age}
+
 
 def main():
-    module = AnsibleModule(argument_spec={})
+    module = AnsibleModule(
+        argument_spec=dict(
+            gather_subset=dict(default=['all'], type='list'),
+            exclude=dict(default=[], type='list'),
+            cache=dict(default=False, type='bool'),
+            cache_dir=dict(default=CACHE_DIR, type='path'),
+            cache_ttl=dict(default=86400, type='int'),
+            lpps_method=dict(default='lslpp', choices=['lslpp', 'odm']),
+            lpps_include=dict(default=[], type='list'),
+            lpps_types=dict(default=[], type='list', choices=['LPP', 'RPM']),
+            lpps_fields=dict(default=[], type='list'),
+            mount_timeout=dict(default=5, type='float'),
+            profile=dict(default=False, type='bool'),
+            fact_format=dict(default='records', choices=['records', 'columnar']),
+            since=dict(default=None, type='str'),
+            oslevel_cache=dict(default=False, type='bool'),
+            oslevel_method=dict(default='oslevel', choices=['oslevel', 'derive']),
+            batch=dict(default=False, type='bool'),
+            collector_timeout=dict(default=300, type='float'),
+            partial_facts=dict(default=True, type='bool'),
+            agent=dict(default=False, type='bool'),
+            agent_socket=dict(default=AGENT_SOCKET, type='path'),
+            fact_file=dict(default=None, type='path'),
+        ),
+    )
+    start = time.time()
+    collectors = _select_collectors(module, module.params['gather_subset'], module.params['exclude'])
+    cache_dir = None
+    if module.params['cache']:
+        cache_dir = module.params['cache_dir']
+    # a derived oslevel is taken from the lpps when they are gathered anyway, and not filtered
+    derive_oslevel = None
+    names = [name for name, loader in collectors]
+    if 'lpps' in names:
+        # bad lpps_include, lpps_types or lpps_fields fail the module, before any collector runs
+        from ansible.module_utils.aix.lpps import check_lpps_params
+        check_lpps_params(module)
+    lpps_filtered = module.params['lpps_include'] or module.params['lpps_types']
+    if module.params['oslevel_method'] == 'derive' and 'oslevel' in names and 'lpps' in names \
+            and not lpps_filtered:
+        derive_oslevel = _load_oslevel().derive_oslevel
+        collectors = [(name, loader) for name, loader in collectors if name != 'oslevel']
     facts = {}
-    facts["oslevel"] = get_oslevel(module)
-    facts["build"] = get_build(module)
-    facts["lpps"] = get_lpps(module)
-    facts["filesystems"] = get_filesystems(module)
-    facts["mounts"] = get_mounts(module)
-    facts["vgs"] = get_vgs(module)
-    facts["lssrc"] = get_lssrc(module)
-    facts["niminfo"] = get_niminfo(module)
-    facts["lparstat"] = get_lparstat(module)
-
-    module.exit_json(changed=False, rc=0, ansible_facts=facts)
+    errors = {}
+    agent_status = None
+    if module.params['agent']:
+        facts, errors, agent_status = _ask_agent(module, [name for name, loader in collectors])
+        collectors = [(name, loader) for name, loader in collectors if name not in facts and name not in errors]
+    # the collectors are imported here, in the main thread, not in the workers
+    collectors = [(name, loader()) for name, loader in collectors]
+    gathered, failed, cache_status, profile = run_collectors(module, collectors, cache_dir=cache_dir,
+                                                             cache_ttl=module.params['cache_ttl'],
+                                                             batch=module.params['batch'],
+                                                             timeout=module.params['collector_timeout'])
+    facts.update(gathered)
+    errors.update(failed)
+    if derive_oslevel is not None and 'lpps' in facts:
+        facts['oslevel'] = derive_oslevel(facts['lpps'])
+        if facts['oslevel'] is None:
+            del facts['oslevel']
+            errors['oslevel'] = {'msg': "could not derive oslevel, bos.rte is not in the lpps"}
+    elif derive_oslevel is not None:
+        errors['oslevel'] = {'msg': "could not derive oslevel, lpps could not be determined"}
+    if errors and not module.params['partial_facts']:
+        module.fail_json(msg="could not determine facts: " + ', '.join(sorted(errors)),
+                         rc=1, errors=errors)
+    if 'lpps' in facts:
+        from ansible.module_utils.aix.lpps import index_lpps
+        facts['lpps_by_fileset'] = index_lpps(facts['lpps'])
+    fact_file = None
+    if module.params['fact_file']:
+        try:
+            generated_at = write_fact_file(module.params['fact_file'], facts, errors)
+        except (IOError, OSError) as e:
+            module.fail_json(msg="could not write the fact file %s" % module.params['fact_file'], err=str(e))
+        fact_file = {'path': module.params['fact_file'], 'generated_at': generated_at}
+    delta = None
+    if module.params['since'] is not None:
+        delta = make_delta(facts, module.params['since'], os.path.join(module.params['cache_dir'], 'snapshots'))
+        if 'lpps' not in facts:
+            facts.pop('lpps_by_fileset', None)
+    if module.params['fact_format'] == 'columnar':
+        for name in COLUMNAR_FACTS:
+            if name in facts:
+                facts[name] = records_to_columns(facts[name])
+
+    result = dict(changed=False, rc=0, ansible_facts=facts, facts_errors=errors)
+    if cache_dir:
+        result['facts_cache'] = cache_status
+    if agent_status is not None:
+        result['facts_agent'] = agent_status
+    if delta is not None:
+        result['facts_delta'] = delta
+    if fact_file is not None:
+        result['facts_file'] = fact_file
+    if module.params['profile']:
+        result['facts_profile'] = {'seconds': round(time.time() - start, 4), 'collectors': profile}
+    module.exit_json(**result)
 
 
 if __name__ == '__main__':
@@ -55,6 +55,26 @@ options:
   spot:
     description: Name of the Spot at the nomserver
     type: string
+  lpp_source_cache:
+    description:
+      - Keep the list of the filesets and versions in the lpp_source in cache_dir on the client,
+        so the next install from the same lpp_source does not ask the NIM master for it.
+        When a fileset is not in the cached list, it is asked again.
+    default: false
+    type: bool
+  lpp_source_cache_ttl:
+    description: Maximum age in seconds of the cached list of an lpp_source, 0 keeps it until lpp_source_checksum changes.
+    default: 86400
+    type: int
+  lpp_source_checksum:
+    description:
+      - A checksum of the lpp_source, f.i. of its listing on the NIM master. The cached list is only
+        used for the same checksum, so a rebuilt lpp_source is listed again.
+    type: string
+  cache_dir:
+    description: Directory on the client which holds the cache.
+    default: /var/adm/ansible/AIX_facts
+    type: path
 
 notes:
   - The changes are persistent across reboots.
@@ -89,6 +109,14 @@ EXAMPLES = '''
       - update_all
     lpp_source: lppsource_aix6109-06
 
+- name: install from an lpp_source which does not change, without listing it on the NIM master every run
+  AIX_nimclient:
+    name:
+      - OpenGL.OpenGL_X.rte.soft
+    lpp_source: lppsource_aix6109-06
+    lpp_source_cache: true
+    lpp_source_cache_ttl: 0
+
 - name: allocate spot and lpp_source to the nimclient
   AIX_nimclient:
     lpp_source: lppsource_aix6109-06
@@ -111,9 +139,13 @@ RETURN = '''
 '''
 
 # Import necessary libraries
+import hashlib
 import itertools
 import re
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.aix.cache import CACHE_DIR, cache_load, cache_store
+from ansible.module_utils.aix.commands import bin_path, get_bin_path
+from ansible.module_utils.aix.version import latest_version, sort_versions, version_key
 
 # end import modules
 # start defining the functions
@@ -122,7 +154,7 @@ from ansible.module_utils.basic import AnsibleModule
 # internal procedures
 
 def _check(module, resourcename):
-    cmd = "/usr/sbin/nimclient -l " + resourcename
+    cmd = bin_path("/usr/sbin/nimclient") + " -l " + resourcename
     rc, out, err = module.run_command(cmd)
     if rc == 0:
         if err != '':
@@ -136,46 +168,98 @@ def _check(module, resourcename):
     return True
 
 
-def _check_fileset_installed(module, filesetname):
-    reqcmd = "/usr/bin/lslpp -Lcq " + filesetname
+def _installed_index(module, filesetnames):
+    # run one lslpp -Lcq for all filesets and return the type (LPP or RPM, None if unknown)
+    # and the level of the installed ones by their name, a fileset which is not installed is left out.
+    # lslpp lists the installed ones and fails with "not installed" for the others.
+    # An RPM is found by its package name, an LPP by its fileset or package name.
+    index = {}
+    if not filesetnames:
+        return index
+    reqcmd = [bin_path("/usr/bin/lslpp"), "-Lcq"] + list(filesetnames)
     rc, out, err = module.run_command(reqcmd)
-    if rc == 0:
-        res = True
-    elif "not installed" in err:
-        res = False
-    else:
-        msg = "ERROR: recieving install status for fileset " + filesetname
+    if rc != 0 and "not installed" not in err:
+        msg = "ERROR: recieving install status for filesets " + ' '.join(filesetnames)
         module.fail_json(
-            msg=msg, err=msg, rc=rc)
-    return res
-
-
-def _check_fileset_type(module, filesetname):
-    reqcmd = "/usr/bin/lslpp -Lcq " + filesetname
-    rc, out, err = module.run_command(reqcmd)
-    if rc == 0:
-        outsplit = out.split(':')
-        filesettype = outsplit[6]
+            msg=msg, err=err, rc=rc)
+    for line in out.splitlines():
+        outsplit = line.split(':')
+        if len(outsplit) < 7:
+            continue
         if outsplit[6] == "R":
             filesettype = 'RPM'
         elif outsplit[6] == " " or outsplit[6] == "F":
             filesettype = 'LPP'
         else:
-            msg = "ERROR: Unable to determine the fileset type of fileset: " + filesetname
-            module.fail_json(
-                msg=msg, err=err, rc=rc)
-    else:
-        msg = "ERROR: Fileset: " + filesetname + " not installed"
+            filesettype = None
+        installed = {'type': filesettype, 'level': outsplit[2].strip()}
+        index.setdefault(outsplit[0], installed)
+        if filesettype != 'RPM':
+            index.setdefault(outsplit[1], installed)
+    return index
+
+
+def _lpp_source_cache_name(lpp_source):
+    # the name of the cache entry of an lpp_source, a NIM name is no safe file name
+    return 'lpp_source-' + hashlib.sha1(lpp_source.encode('utf-8')).hexdigest()[:16]
+
+
+def _cached_lpp_source_index(module):
+    # return the cached index of the lpp_source, see _lpp_source_index, or None
+    if not module.params['lpp_source_cache']:
+        return None
+    entry = cache_load(module.params['cache_dir'], _lpp_source_cache_name(module.params['lpp_source']),
+                       module.params['lpp_source_checksum'], module.params['lpp_source_cache_ttl'] or None)
+    if entry is None:
+        return None
+    return entry['facts']
+
+
+def _lpp_source_index(module, lpp_source):
+    # list the lpp_source with showres and return the versions of every fileset in it
+    # by the name of the fileset, like {'xlsmp.rte': ['3.1.0.6', '4.1.2.0'], 'cdrecord': ['1.9-9']}
+    # sorted from the oldest to the latest version, so the latest is the last one
+    # with lpp_source_cache the index is cached
+    cmd = bin_path("/usr/sbin/nimclient") + " -o showres -a resource=" + lpp_source
+    rc, out, err = module.run_command(cmd)
+    if rc != 0:
+        msg = "ERROR: could not list the filesets in LPP_SOURCE: " + lpp_source
         module.fail_json(
             msg=msg, err=err, rc=rc)
-    return filesettype
-
+    # output is like:
+    #
+    # xlsmp.rte                                                          ALL  @@I:xlsmp.rte _all_filesets
+    # + 3.1.0.6  SMP Runtime Library                                         @@I:xlsmp.rte 3.1.0.6
+    #  @ 4.1.2.0  SMP Runtime Library                                         @@I:xlsmp.rte 4.1.2.0
+    #
+    #  cdrecord                                                           ALL  @@R:cdrecord _all_filesets
+    #  @@R:cdrecord-1.9-9 1.9-9
+    #
+    # first find all line with an @@
+    # Then remove all line with "ALL"
+    # Then split the the lines with @@. We keep output like
+    # I:xlsmp.rte 3.1.0.6
+    # I:xlsmp.rte 4.1.2.0
+    # R:cdrecord-1.9-9 1.9-9
+    # if the fileset is an RPM ( starts with an R )
+    # then stip the version name of the filesetname
+    index = {}
+    for line in out.splitlines():
+        line = line.rstrip()
+        if re.search('@@[A-Z]:', line) and not "ALL" in line:
+            restline = line.split('@@')
+            filesettype = restline[1].split(':')[0]  # find the fileset type ( R = RPM , I/S = LPP )
+            fs, ver = restline[1].split(':')[1].split()
+            if filesettype == "R":
+                fs = re.split('-[0-9]+', fs)[0]  # remove the version number from the filesetname
+            index.setdefault(fs, []).append(ver)
+    for fs in index:
+        index[fs] = sort_versions(index[fs])
+    if module.params['lpp_source_cache']:
+        cache_store(module.params['cache_dir'], _lpp_source_cache_name(lpp_source),
+                    module.params['lpp_source_checksum'], index)
+    return index
 
-def _versiontuple(v):
-    filled = []
-    for point in v.split("."):
-        filled.append(point.zfill(8))
-    return tuple(filled)
 
 # functions
 
@@ -184,7 +268,7 @@ def allocate(module):
     # allocate resources to the nimclient
     # build the options
     result = {}
-    cmd = ['/usr/sbin/nimclient']
+    cmd = [bin_path('/usr/sbin/nimclient')]
     options = ['-o', 'allocate']
     msg = []
     if module.params['lpp_source'] is not None:
@@ -213,7 +297,7 @@ def allocate(module):
 def deallocate(module):
     # deallocate resources
     result = {}
-    cmd = ['/usr/sbin/nimclient']
+    cmd = [bin_path('/usr/sbin/nimclient')]
     options = ['-o', 'deallocate', '-a', 'subclass=all']
     cmd += options
     rc, out, err = module.run_command(cmd)
@@ -232,7 +316,7 @@ def reset(module):
     # then reset nimclient
     result = {}
     result = deallocate(module)
-    cmd = ['/usr/sbin/nimclient']
+    cmd = [bin_path('/usr/sbin/nimclient')]
     options = ['-F', '-o', 'reset']
     cmd += options
     rc, out, err = module.run_command(cmd)
@@ -246,132 +330,151 @@ def reset(module):
     return result
 
 
+def _installp_summary(out):
+    # return the result (SUCCESS, FAILED, ...) of every fileset in the Installation Summary
+    # of installp by its name. A fileset has a line for each part (USR, ROOT, SHARE),
+    # it failed if one of them failed.
+    results = {}
+    in_summary = False
+    for line in out.splitlines():
+        if line.startswith("Installation Summary"):
+            in_summary = True
+            continue
+        fields = line.split()
+        if not in_summary or len(fields) != 5 or fields[0] == "Name":
+            continue
+        if results.get(fields[0]) != "FAILED":
+            results[fields[0]] = fields[4]
+    return results
+
+
+def _remove_rpms(module, rpms):
+    # remove the RPMs with one rpm -e and return the result of every one by its name.
+    # rpm removes nothing when one of them can not be removed, then every RPM is
+    # removed on its own to find out which one failed.
+    rpmcmd = bin_path("/usr/bin/rpm")
+    rc, out, err = module.run_command([rpmcmd, "-e"] + rpms)
+    if rc == 0 or len(rpms) == 1:
+        return dict((fileset, 'removed' if rc == 0 else 'failed') for fileset in rpms), err
+    results = {}
+    errors = []
+    for fileset in rpms:
+        rc, out, err = module.run_command([rpmcmd, "-e", fileset])
+        results[fileset] = 'removed' if rc == 0 else 'failed'
+        if rc != 0:
+            errors.append(err)
+    return results, ''.join(errors)
+
+
 def uninstall(module):
     # first findout what the type of fileset it is with lslpp
-    # then remove the fileset with installp or rpm
+    # then remove all LPPs with one installp and all RPMs with one rpm
     result = {}
     result['msg'] = "SUCCESS: "
+    filesets = []
     for fileset in module.params['name']:
-        fileset = fileset.split()[0]
-        if _check_fileset_installed(module, fileset):
-            filesettype = _check_fileset_type(module, fileset)
+        if fileset.split()[0] not in filesets:
+            filesets.append(fileset.split()[0])
+    installed = _installed_index(module, filesets)
+    lpps = []
+    rpms = []
+    for fileset in filesets:
+        if fileset in installed:
+            filesettype = installed[fileset]['type']
             if filesettype == 'RPM':
-                rmcmd = "rpm -e " + fileset
+                rpms.append(fileset)
             elif filesettype == 'LPP':
-                rmcmd = "installp -gu " + fileset
+                lpps.append(fileset)
             else:
-                msg = "ERROR: install type of fileset: " + fileset + " not known"
-                module.fail_json(
-                    msg=msg, err=err, rc='1')
-            # remove the fileset
-            rc, out, err = module.run_command(rmcmd)
-            if rc != 0:
-                msg = "ERROR: Fileset: " + fileset + " not removed"
+                msg = "ERROR: Unable to determine the fileset type of fileset: " + fileset
                 module.fail_json(
-                    msg=msg, err=err, rc=rc)
-            else:
-                result['msg'] = result['msg'] + \
-                    " Fileset: " + fileset + " removed"
-                result['changed'] = True
+                    msg=msg, rc=1)
+
+    removed = dict((fileset, 'not installed') for fileset in filesets if fileset not in installed)
+    errors = []
+    if lpps:
+        rc, out, err = module.run_command([bin_path("/usr/sbin/installp"), "-gu"] + lpps)
+        summary = _installp_summary(out)
+        # a package name or a fileset removed as a requisite of another one may not be
+        # in the summary under the requested name, ask lslpp whether those are gone
+        unsure = [fileset for fileset in lpps if summary.get(fileset) != "SUCCESS"]
+        still_installed = _installed_index(module, unsure)
+        for fileset in lpps:
+            removed[fileset] = 'failed' if fileset in still_installed else 'removed'
+        if still_installed:
+            errors.append(err)
+    if rpms:
+        results, err = _remove_rpms(module, rpms)
+        removed.update(results)
+        errors.append(err)
+
+    result['filesets'] = removed
+    failed = [fileset for fileset in filesets if removed[fileset] == 'failed']
+    if failed:
+        msg = "ERROR: Fileset: " + ' '.join(failed) + " not removed"
+        module.fail_json(
+            msg=msg, err=''.join(errors), rc=1, filesets=removed)
+    for fileset in filesets:
+        if removed[fileset] == 'removed':
+            result['msg'] = result['msg'] + \
+                " Fileset: " + fileset + " removed"
+            result['changed'] = True
     return result
 
 
-def install(module):
+def install(module, fsversions_in_lppsource=None):
     # This function will install individual filesets
     # findout what version is installed
     # findout what version in in the lppsource ( resource)
     # and if the fileset is in the lpp_source
     # if the version in the lpp source is newer, install newer version if a
     # version is not specified, otherwise install specified version
+    # fsversions_in_lppsource is the cached index of the lpp_source, if there is one
     result = {}
     result['changed'] = False
     list_filesets_to_install = []
-    fsversion_in_lppsource = {}
-    requested_version = ''
+    cached = fsversions_in_lppsource is not None
+    installed = _installed_index(module, [fileset.split()[0] for fileset in module.params['name']])
     for fileset in module.params['name']:
+        requested_version = ''
         # if fileset is installed check the version of installed fileset
         if len(fileset.split()) == 2:
             filesetname, requested_version = fileset.split()
         else:
             filesetname = fileset.split()[0]
         # if the fileset in an RPM, it might the version of the RPM in included in the name
-        if _check_fileset_installed(module, filesetname):
-            cmd = "/usr/sbin/nimclient -o showres -a resource=" + \
-                module.params['lpp_source']
-            rc, out, err = module.run_command(cmd)
-            # output is like:
-            #
-            # xlsmp.rte                                                          ALL  @@I:xlsmp.rte _all_filesets
-            # + 3.1.0.6  SMP Runtime Library                                         @@I:xlsmp.rte 3.1.0.6
-            #  @ 4.1.2.0  SMP Runtime Library                                         @@I:xlsmp.rte 4.1.2.0
-            #
-            #  cdrecord                                                           ALL  @@R:cdrecord _all_filesets
-            #  @@R:cdrecord-1.9-9 1.9-9
-            #
-            # first find all line with an @@
-            # Then remove all line with "ALL"
-            # Then split the the lines with @@. We keep output like
-            # I:xlsmp.rte 3.1.0.6
-            # I:xlsmp.rte 4.1.2.0
-            # R:cdrecord-1.9-9 1.9-9
-            # if the fileset is an RPM ( starts with an R )
-            # then stip the version name of the filesetname
-
-            if rc == 0:
-                for line in out.splitlines():
-                    line = line.rstrip()
-                    if re.search(
-                            '@@[A-Z]:', line):  # only all lines with @@ in the line
-                        if not "ALL" in line:
-                            restline = line.split('@@')
-                            filesettype = restline[1].split(':')[0]  # find the fileset type ( R = RPM , I/S = LPP )
-                            fs, ver = restline[1].split(':')[1].split()
-                            if filesettype == "R":
-                                fs = re.split('-[0-9]+', fs)[0]  # remove the version number from the filesetname
-                            if fs in fsversion_in_lppsource.keys():
-                                if _versiontuple(ver) > _versiontuple(
-                                        fsversion_in_lppsource[fs]):
-                                    fsversion_in_lppsource[fs] = ver
-                            else:
-                                fsversion_in_lppsource[fs] = ver
-
-                if not filesetname in fsversion_in_lppsource.keys():
-                    msg = "ERROR: fileset: " + fileset + \
-                        " is not avalable in LPP_SOURCE: " + module.params['lpp_source']
-                    module.fail_json(
-                        msg=msg, err=err, rc=rc)
-            else:
-                msg = "ERROR: could not retrieve fileset level on fileset: " + fileset
+        if filesetname in installed:
+            # the lpp_source is listed once, for the first installed fileset
+            if fsversions_in_lppsource is None:
+                fsversions_in_lppsource = _lpp_source_index(module, module.params['lpp_source'])
+            # a fileset which is not in the cached index is looked for in a new listing, once
+            if cached and not filesetname in fsversions_in_lppsource:
+                cached = False
+                _check(module, module.params['lpp_source'])
+                fsversions_in_lppsource = _lpp_source_index(module, module.params['lpp_source'])
+            if not filesetname in fsversions_in_lppsource:
+                msg = "ERROR: fileset: " + fileset + \
+                    " is not avalable in LPP_SOURCE: " + module.params['lpp_source']
                 module.fail_json(
-                    msg=msg, err=err, rc=rc)
+                    msg=msg, rc=1)
 
             # check fileset version
-            fileset_version_installed = ""
-            cmd = "/usr/bin/lslpp -Lqc " + filesetname
-            rc, out, err = module.run_command(cmd)
-            if rc == 0:
-                fileset_version_installed = out.split(":")[2].strip()
-            else:
-                msg = "ERROR: cant determine current installed version"
-                module.fail_json(
-                    msg=msg, err=err, rc=rc)
+            fileset_version_installed = installed[filesetname]['level']
             # if installed version < requested version:  install requested version if requested version is available
             # if no requested version: install latest version
             # if installed version => requested version: Do nothing
             if not requested_version == '':
-                if _versiontuple(fileset_version_installed) < _versiontuple(
-                        requested_version):
+                if version_key(fileset_version_installed) < version_key(requested_version):
                     list_filesets_to_install.append(fileset)
             else:
-                if _versiontuple(fileset_version_installed) < _versiontuple(
-                        fsversion_in_lppsource[fileset]):
+                if latest_version(fsversions_in_lppsource[filesetname], newer_than=fileset_version_installed):
                     list_filesets_to_install.append(fileset)
         else:
             list_filesets_to_install.append(fileset)
     # install the filesets is there is a list of filesets to install
     if list_filesets_to_install:
         list_filesets_to_install_str = ' '.join(list_filesets_to_install)
-        cmd = "/usr/sbin/nimclient -o cust -a installp_flags=acgwXY -a lpp_source=" + \
+        cmd = bin_path("/usr/sbin/nimclient") + " -o cust -a installp_flags=acgwXY -a lpp_source=" + \
             module.params['lpp_source'] + " -a filesets=" + '"' + list_filesets_to_install_str + '"'
         rc, out, err = module.run_command(cmd)
         if rc == 0:
@@ -392,7 +495,7 @@ def update(module):
     # this function will do an update_all
     # it needs the lpp_source and runs the nim -o cust -a installp_flags acgwXY
     result = {}
-    cmd = "/usr/sbin/nimclient -o cust -a installp_flags=acgwXY -a lpp_source=" + \
+    cmd = bin_path("/usr/sbin/nimclient") + " -o cust -a installp_flags=acgwXY -a lpp_source=" + \
         module.params['lpp_source'] + " -a fixes=update_all"
     rc, out, err = module.run_command(cmd)
 
@@ -427,6 +530,10 @@ def main():
             ], default='present'),
             lpp_source=dict(type='str'),
             spot=dict(type='str'),
+            lpp_source_cache=dict(default=False, type='bool'),
+            lpp_source_cache_ttl=dict(default=86400, type='int'),
+            lpp_source_checksum=dict(type='str'),
+            cache_dir=dict(default=CACHE_DIR, type='path'),
         ),
     )
 
@@ -437,9 +544,9 @@ def main():
     }
 
     # Find commandline strings
-    nimclient = module.get_bin_path('nimclient')
-    lslpp = module.get_bin_path('lslpp')
-    rpm = module.get_bin_path('rpm')
+    nimclient = get_bin_path(module, 'nimclient')
+    lslpp = get_bin_path(module, 'lslpp')
+    rpm = get_bin_path(module, 'rpm')
     rc = 0
 
     if module.params['state'] == 'allocate':
@@ -469,12 +576,14 @@ def main():
             msg = "ERROR: lpp_source may not be empty"
             module.fail_json(
                 msg=msg, rc=1)
-        else:
+        # the lpp_source existed when it was cached
+        fsversions_in_lppsource = _cached_lpp_source_index(module)
+        if fsversions_in_lppsource is None:
             _check(module, module.params['lpp_source'])
         if "update_all" in module.params['name']:
             result = update(module)
         else:
-            result = install(module)
+            result = install(module, fsversions_in_lppsource)
 
     module.exit_json(**result)
 
@@ -0,0 +1,388 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+ANSIBLE_METADATA = {'status': ['preview'],
+                    'supported_by': 'community',
+                    'metadata_version': '1.0'}
+
+
+DOCUMENTATION = '''
+---
+module: aix_facts_agent
+short_description: Installs the AIX_facts agent on AIX.
+description:
+    - Installs or removes the facts agent of AIX_facts, a long running process started from the inittab,
+      which keeps the facts of all collectors and serves them on a UNIX socket.
+      AIX_facts with agent true gets its facts from the agent within milliseconds, instead of
+      running the commands, and gathers them itself when the agent does not run.
+    - With fact_file the agent writes the facts to a facts.d file after every refresh as well,
+      so setup returns them as ansible_local. With run_from C(cron) the agent does not run
+      all the time, cron runs it every interval to write the fact file only.
+    - The agent gathers all collectors when it starts and then again every interval seconds,
+      the oslevel, lpps and filesystems as soon as the ODM, rpm or efix databases or /etc/filesystems change.
+    - The agent runs without ansible, the module_utils of AIX_facts are copied to agent_dir.
+      Run the module again after an update of the module_utils, the agent is restarted when they changed.
+version_added: "2.4"
+options:
+  state:
+    description: Whether the agent should be installed and running, or removed.
+    choices: [ present, absent ]
+    default: present
+  agent_dir:
+    description: Directory on the host which holds the agent.
+    default: /var/adm/ansible/AIX_facts/agent
+    type: path
+  socket:
+    description: The UNIX socket the agent serves on, give the same agent_socket to AIX_facts.
+    default: /var/adm/ansible/AIX_facts/agent.sock
+    type: path
+  interval:
+    description: Seconds after which the agent gathers a collector again.
+    default: 300
+    type: float
+  check:
+    description: Seconds between the checks of the ODM, rpm, efix databases and /etc/filesystems.
+    default: 10
+    type: float
+  collector_timeout:
+    description: Seconds every collector of the agent may take, see AIX_facts.
+    default: 300
+    type: float
+  lpps_method:
+    description: How the agent builds the lpps fact, see AIX_facts.
+    default: lslpp
+    choices: [ lslpp, odm ]
+  python:
+    description: The python the agent runs with, default the python which runs this module.
+    type: path
+  fact_file:
+    description:
+      - Write the facts to this file after every refresh, f.i. /etc/ansible/facts.d/aix.fact,
+        see the fact_file of AIX_facts. Required with run_from C(cron).
+    type: path
+  run_from:
+    description:
+      - C(inittab) runs the agent all the time, it serves the facts on the socket and writes the fact file.
+      - C(cron) runs the agent from the crontab of root every interval (in whole minutes, or whole
+        hours from an hour on), it only writes the fact file.
+    default: inittab
+    choices: [ inittab, cron ]
+notes:
+  - The inittab entry is aixfacts, with action respawn, so init restarts the agent when it stops.
+    The crontab entry ends with the comment aix_facts_agent.
+  - You need root rights to change the inittab.
+'''
+
+EXAMPLES = '''
+- name: install the facts agent
+  aix_facts_agent:
+    state: present
+  become: yes
+
+- name: gather the facts from the agent
+  AIX_facts:
+    agent: true
+  become: yes
+
+- name: refresh /etc/ansible/facts.d/aix.fact every 15 minutes from cron
+  aix_facts_agent:
+    run_from: cron
+    interval: 900
+    fact_file: /etc/ansible/facts.d/aix.fact
+  become: yes
+
+- name: remove the facts agent
+  aix_facts_agent:
+    state: absent
+  become: yes
+'''
+
+RETURN = '''
+msg:
+    description: what was done
+    returned: always
+    type: string
+    sample: installed the agent in /var/adm/ansible/AIX_facts/agent, added inittab entry aixfacts
+'''
+
+# import modules needed
+import os
+import sys
+import shutil
+import signal
+import tempfile
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.aix.commands import get_bin_path
+from ansible.module_utils.aix.agent import AGENT_SOCKET
+from ansible.module_utils.aix.cache import CACHE_DIR
+# the agent runs these, they are imported so they are shipped with the module and can be copied
+from ansible.module_utils.aix import agent, batch, build, cache, commands, engine, factsd, filesystems, \
+    lparstat, lpps, lssrc, mounts, niminfo, oslevel, parsers, vgs
+
+# end import modules
+
+# start defining the functions
+
+AGENT_MODULE_UTILS = (agent, batch, build, cache, commands, engine, factsd, filesystems,
+                      lparstat, lpps, lssrc, mounts, niminfo, oslevel, parsers, vgs)
+
+INITTAB_NAME = 'aixfacts'
+
+# the comment at the end of the crontab entry
+CRON_MARKER = '# aix_facts_agent'
+
+AGENT_SCRIPT = '''#!%(python)s
+#
+# The AIX_facts agent, installed by the aix_facts_agent module
+#
+import sys
+sys.path.insert(0, %(agent_dir)r)
+from ansible.module_utils.aix.agent import main
+sys.exit(main())
+'''
+
+
+def _module_source(mod):
+    """
+    Internal function that returns the source of the module mod, which can be in the
+    zip of the module or on disk
+    """
+    loader = getattr(mod, '__loader__', None)
+    if loader is not None and hasattr(loader, 'get_source'):
+        source = loader.get_source(mod.__name__)
+        if source is not None:
+            return source
+    path = mod.__file__
+    if path.endswith(('.pyc', '.pyo')):
+        path = path[:-1]
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def agent_files(module):
+    """
+    returns the files of the agent, by their path relative to agent_dir
+    """
+    files = {
+        os.path.join('ansible', '__init__.py'): '',
+        os.path.join('ansible', 'module_utils', '__init__.py'): '',
+        os.path.join('ansible', 'module_utils', 'aix', '__init__.py'): '',
+        'aix_facts_agent.py': AGENT_SCRIPT % {'python': module.params['python'],
+                                              'agent_dir': module.params['agent_dir']},
+    }
+    for mod in AGENT_MODULE_UTILS:
+        name = mod.__name__.rsplit('.', 1)[1]
+        files[os.path.join('ansible', 'module_utils', 'aix', name + '.py')] = _module_source(mod)
+    return files
+
+
+def write_files(module, files):
+    """
+    writes the files which changed to agent_dir, returns their paths
+    """
+    changed = []
+    for relpath in sorted(files):
+        path = os.path.join(module.params['agent_dir'], relpath)
+        content = files[relpath]
+        try:
+            with open(path, 'r') as f:
+                if f.read() == content:
+                    continue
+        except (IOError, OSError):
+            pass
+        changed.append(relpath)
+        if module.check_mode:
+            continue
+        directory = os.path.dirname(path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path))
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            os.chmod(tmp, 0o700 if relpath == 'aix_facts_agent.py' else 0o600)
+            os.rename(tmp, path)
+        except (IOError, OSError) as e:
+            module.fail_json(msg="could not write %s" % path, err=str(e))
+    return changed
+
+
+def agent_command(module, once=False):
+    """
+    returns the command of the inittab entry, or with once the one of the crontab entry
+    """
+    p = module.params
+    command = '%s %s --collector-timeout %s --lpps-method %s' % (
+        p['python'], os.path.join(p['agent_dir'], 'aix_facts_agent.py'), p['collector_timeout'], p['lpps_method'])
+    if p['fact_file']:
+        command += ' --fact-file %s' % p['fact_file']
+    if once:
+        command += ' --once'
+    else:
+        command += ' --socket %s --interval %s --check %s --pidfile %s' % (
+            p['socket'], p['interval'], p['check'], os.path.join(p['agent_dir'], 'agent.pid'))
+    return command + ' >/dev/null 2>&1'
+
+
+def cron_schedule(interval):
+    """
+    returns the time fields of a crontab entry which runs every interval seconds,
+    in whole minutes below an hour and in whole hours from an hour on
+    """
+    minutes = max(1, int(interval // 60))
+    if minutes < 60:
+        return '*/%d * * * *' % minutes
+    return '0 */%d * * *' % max(1, min(23, minutes // 60))
+
+
+def set_cron_entry(module, entry):
+    """
+    replaces the crontab entry of the agent in the crontab of root with entry,
+    or removes it with entry None. returns True if the crontab changed.
+    """
+    crontab = get_bin_path(module, 'crontab', required=True)
+    rc, out, err = module.run_command([crontab, '-l'])
+    # without a crontab crontab -l fails
+    current = out.splitlines() if rc == 0 else []
+    lines = [line for line in current if not line.endswith(CRON_MARKER)]
+    if entry is not None:
+        lines.append('%s %s' % (entry, CRON_MARKER))
+    if lines == current:
+        return False
+    if not module.check_mode:
+        fd, tmp = tempfile.mkstemp(prefix='aix_facts_agent')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            rc, out, err = module.run_command([crontab, tmp])
+        finally:
+            os.remove(tmp)
+        if rc != 0:
+            module.fail_json(msg="could not change the crontab", rc=rc, err=err)
+    return True
+
+
+def current_entry(module):
+    """
+    returns the inittab entry of the agent, or None
+    """
+    rc, out, err = module.run_command([get_bin_path(module, 'lsitab', required=True), INITTAB_NAME])
+    if rc != 0 or not out.strip():
+        return None
+    return out.strip()
+
+
+def stop_agent(module):
+    """
+    stops the running agent, init starts it again while the inittab entry is there
+    """
+    try:
+        with open(os.path.join(module.params['agent_dir'], 'agent.pid'), 'r') as f:
+            pid = int(f.read())
+        os.kill(pid, signal.SIGTERM)
+    except (IOError, OSError, ValueError):
+        pass
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            state=dict(default='present', choices=['present', 'absent']),
+            agent_dir=dict(default=os.path.join(CACHE_DIR, 'agent'), type='path'),
+            socket=dict(default=AGENT_SOCKET, type='path'),
+            interval=dict(default=300, type='float'),
+            check=dict(default=10, type='float'),
+            collector_timeout=dict(default=300, type='float'),
+            lpps_method=dict(default='lslpp', choices=['lslpp', 'odm']),
+            python=dict(type='path'),
+            fact_file=dict(default=None, type='path'),
+            run_from=dict(default='inittab', choices=['inittab', 'cron']),
+        ),
+        supports_check_mode=True,
+    )
+    if not module.params['python']:
+        module.params['python'] = sys.executable
+
+    if module.params['run_from'] == 'cron' and module.params['state'] == 'present' \
+            and not module.params['fact_file']:
+        module.fail_json(msg="run_from cron needs a fact_file")
+
+    result = {'changed': False, 'msg': []}
+    telinit = get_bin_path(module, 'telinit', required=True)
+    entry = current_entry(module)
+    from_inittab = module.params['state'] == 'present' and module.params['run_from'] == 'inittab'
+    from_cron = module.params['state'] == 'present' and module.params['run_from'] == 'cron'
+
+    if module.params['state'] == 'present':
+        changed_files = write_files(module, agent_files(module))
+        if changed_files:
+            result['changed'] = True
+            result['msg'].append("installed the agent in %s" % module.params['agent_dir'])
+
+    if from_inittab:
+        new_entry = '%s:2:respawn:%s' % (INITTAB_NAME, agent_command(module))
+        if entry != new_entry:
+            result['changed'] = True
+            if entry is None:
+                command = [get_bin_path(module, 'mkitab', required=True), new_entry]
+                result['msg'].append("added inittab entry " + INITTAB_NAME)
+            else:
+                command = [get_bin_path(module, 'chitab', required=True), new_entry]
+                result['msg'].append("changed inittab entry " + INITTAB_NAME)
+            if not module.check_mode:
+                rc, out, err = module.run_command(command)
+                if rc != 0:
+                    module.fail_json(msg="could not change inittab", rc=rc, err=err)
+        if result['changed'] and not module.check_mode:
+            # a running agent has the old files or arguments, init starts the new one
+            stop_agent(module)
+            rc, out, err = module.run_command([telinit, 'q'])
+            if rc != 0:
+                module.fail_json(msg="could not make init read the inittab", rc=rc, err=err)
+    elif entry is not None:
+        result['changed'] = True
+        result['msg'].append("removed inittab entry " + INITTAB_NAME)
+        if not module.check_mode:
+            rc, out, err = module.run_command([get_bin_path(module, 'rmitab', required=True), INITTAB_NAME])
+            if rc != 0:
+                module.fail_json(msg="could not remove inittab entry", rc=rc, err=err)
+            module.run_command([telinit, 'q'])
+            stop_agent(module)
+
+    cron_entry = None
+    if from_cron:
+        cron_entry = '%s %s' % (cron_schedule(module.params['interval']), agent_command(module, once=True))
+    if set_cron_entry(module, cron_entry):
+        result['changed'] = True
+        result['msg'].append(("changed" if from_cron else "removed") + " the crontab entry")
+
+    if module.params['state'] == 'absent' and os.path.isdir(module.params['agent_dir']):
+        result['changed'] = True
+        result['msg'].append("removed the agent in %s" % module.params['agent_dir'])
+        if not module.check_mode:
+            shutil.rmtree(module.params['agent_dir'], ignore_errors=True)
+            if os.path.exists(module.params['socket']):
+                os.remove(module.params['socket'])
+
+    result['msg'] = ', '.join(result['msg']) or "the agent is " + module.params['state']
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.aix.commands import get_bin_path
 
 DOCUMENTATION = '''
 ---
@@ -80,7 +81,7 @@ def main():
     # check if filesystem exists
     # TODO if exists check fstype
     # TODO if exists check atrestart flag
-    cmd = module.get_bin_path('lsfs', required=True)
+    cmd = get_bin_path(module, 'lsfs', required=True)
     rc, out, err = module.run_command("%s %s" % (cmd, mp))
     if rc == 0:
         if state == 'present':
@@ -94,7 +95,7 @@ def main():
                 module.exit_json(changed=changed)
             else:
                 # rmfs -r <mount-point>
-                cmd = module.get_bin_path('rmfs', required=True)
+                cmd = get_bin_path(module, 'rmfs', required=True)
                 rc, out, err = module.run_command("%s -r %s" % (cmd, mp))
                 if rc != 0:
                     module.fail_json(msg=("Error: Removing filesystem (%s)"
@@ -110,7 +111,7 @@ def main():
                              % (mp))
     # Filesystem is not present and state is present -> create
     # check if lv exists
-    cmd = module.get_bin_path('lslv', required=True)
+    cmd = get_bin_path(module, 'lslv', required=True)
     rc, out, err = module.run_command("%s %s" % (cmd, lv))
     if rc != 0:
         module.fail_json(msg="Error: Logical volume %s does not exist." % (lv),
@@ -131,7 +132,7 @@ def main():
             aflag = 'no'
 
         # crfs  -v jfs2 -A yes -d <logical-volume> -m <mount-point>
-        cmd = module.get_bin_path('crfs', required=True)
+        cmd = get_bin_path(module, 'crfs', required=True)
         rc, out, err = module.run_command(("%s -v %s -A %s -d %s -m %s"
                                           " -a logname=INLINE")
                                           % (cmd, fstype, aflag, lv, mp))
@@ -133,6 +133,7 @@ changed:
 # Import necessary libraries
 import itertools
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.aix.commands import get_bin_path
 
 # end import modules
 # start defining the functions
@@ -142,7 +143,7 @@ def check_current_entry(module):
     # Check if entry exists, if not return False in exists in return dict,
     # if true return True and the entry in return dict
     existsdict = {'exist': False}
-    lsitab = module.get_bin_path('lsitab')
+    lsitab = get_bin_path(module, 'lsitab')
     (rc, out, err) = module.run_command([lsitab, module.params['name']])
     if rc == 0:
         keys = ('name', 'runlevel', 'action', 'command')
@@ -191,9 +192,9 @@ def main():
     }
 
     # Find commandline strings
-    mkitab = module.get_bin_path('mkitab')
-    rmitab = module.get_bin_path('rmitab')
-    chitab = module.get_bin_path('chitab')
+    mkitab = get_bin_path(module, 'mkitab')
+    rmitab = get_bin_path(module, 'rmitab')
+    chitab = get_bin_path(module, 'chitab')
     rc = 0
 
     # check if the new entry exists
@@ -0,0 +1,7 @@
+#
+# Shared collectors of the AIX modules
+#
+# Every collector lives in its own module, so a module only imports (and AnsiballZ
+# only ships) the collectors it uses. The helpers the collectors share are in
+# parsers, commands, cache and engine.
+#
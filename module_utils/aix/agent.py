@@ -0,0 +1,265 @@
+#
+# The facts agent, a long running process on the host which keeps the facts of
+# the collectors and serves them over a UNIX socket, and its client
+#
+# The agent is started from the inittab, see the aix_facts_agent module, and runs
+# without ansible: the module_utils are copied next to it. It gathers all
+# collectors when it starts, and then again every interval seconds, or as soon
+# as the source files of a collector with CACHE_SOURCES changed.
+#
+# A client sends one line of json with the names of the collectors it wants,
+#     {"names": ["oslevel", "lpps"]}
+# and gets the facts and errors the agent has for them, with their age in seconds,
+#     {"facts": {...}, "errors": {...}, "age": {"oslevel": 12.5, ...}, "params": {...}}
+# A collector the agent did not gather yet is left out, the client gathers it itself.
+#
+# With --fact-file the agent writes the facts to a facts.d file after every refresh,
+# see factsd, with --once it does that once and exits, f.i. from cron.
+#
+import os
+import time
+import socket
+import threading
+import optparse
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from ansible.module_utils.aix.cache import CACHE_DIR, fingerprint
+from ansible.module_utils.aix.commands import run_with_deadline
+from ansible.module_utils.aix.engine import CollectorError, run_collectors
+from ansible.module_utils.aix.factsd import write_fact_file
+
+AGENT_SOCKET = os.path.join(CACHE_DIR, 'agent.sock')
+
+# the collectors the agent keeps, by their fact name
+AGENT_COLLECTORS = ('oslevel', 'build', 'lpps', 'filesystems', 'mounts', 'vgs', 'lssrc', 'niminfo', 'lparstat')
+
+# the largest request the agent reads
+MAX_REQUEST = 65536
+
+
+def agent_request(path, names, timeout=5):
+    """
+    asks the agent on the socket path for the facts of the collectors in names.
+    returns its answer, or None if the agent does not run or does not answer in time.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall((json.dumps({'names': list(names)}) + '\n').encode('utf-8'))
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        answer = json.loads(b''.join(chunks).decode('utf-8'))
+    except (socket.error, socket.timeout, IOError, OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if not isinstance(answer, dict) or 'facts' not in answer:
+        return None
+    return answer
+
+
+class AgentModule(object):
+    """
+    Stands in for the AnsibleModule in the agent, which runs without ansible.
+    It has what the collectors use: params, run_command, get_bin_path and fail_json,
+    which raises CollectorError.
+    """
+    def __init__(self, params):
+        self.params = params
+        self.run_command_environ_update = {}
+
+    def run_command(self, args, data=None, binary_data=False, use_unsafe_shell=False, **kwargs):
+        if data is not None and not binary_data:
+            data += '\n'
+        rc, out, err, killed = run_with_deadline(self, args, None, data=data, use_unsafe_shell=use_unsafe_shell)
+        return rc, out, err
+
+    def get_bin_path(self, name, required=False, opt_dirs=None):
+        dirs = list(opt_dirs or []) + os.environ.get('PATH', '').split(os.pathsep) + ['/sbin', '/usr/sbin']
+        for directory in dirs:
+            path = os.path.join(directory, name)
+            if directory and os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+        if required:
+            self.fail_json(msg="could not find %s" % name)
+        return None
+
+    def fail_json(self, **kwargs):
+        raise CollectorError(kwargs)
+
+
+class FactsAgent(object):
+    """
+    Keeps the facts of the collectors, a list of (name, collector module) tuples.
+    refresh gathers the collectors which are older than interval seconds or whose
+    source files changed, answer returns what a client asked for.
+    """
+    def __init__(self, module, collectors, interval, timeout=None):
+        self.module = module
+        self.collectors = collectors
+        self.interval = interval
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.facts = {}
+        self.errors = {}
+        self.gathered = {}
+        self.fingerprints = {}
+
+    def _due(self, now):
+        """
+        returns the collectors which have to be gathered again, with the fingerprint of their sources
+        """
+        due = []
+        for name, collector in self.collectors:
+            sources = getattr(collector, 'CACHE_SOURCES', None)
+            current = sources and fingerprint(sources)
+            if name not in self.gathered or now - self.gathered[name] >= self.interval or \
+                    current != self.fingerprints.get(name):
+                due.append((name, collector, current))
+        return due
+
+    def refresh(self):
+        """
+        gathers the collectors which are due, returns their names
+        """
+        due = self._due(time.time())
+        if not due:
+            return []
+        facts, errors, cache_status, profile = run_collectors(
+            self.module, [(name, collector) for name, collector, current in due], timeout=self.timeout)
+        now = time.time()
+        with self.lock:
+            for name, collector, current in due:
+                self.facts.pop(name, None)
+                self.errors.pop(name, None)
+                if name in facts:
+                    self.facts[name] = facts[name]
+                else:
+                    self.errors[name] = errors.get(name, {'msg': "collector %s returned nothing" % name})
+                self.gathered[name] = now
+                self.fingerprints[name] = current
+        return [name for name, collector, current in due]
+
+    def write_fact_file(self, path):
+        """
+        writes the facts of all collectors to the fact file path, with lpps_by_fileset
+        """
+        from ansible.module_utils.aix.lpps import index_lpps
+        with self.lock:
+            facts = dict(self.facts)
+            errors = dict(self.errors)
+        if 'lpps' in facts:
+            facts['lpps_by_fileset'] = index_lpps(facts['lpps'])
+        write_fact_file(path, facts, errors)
+
+    def answer(self, names):
+        """
+        returns the answer to a client which asked for the collectors in names
+        """
+        now = time.time()
+        result = {'facts': {}, 'errors': {}, 'age': {}, 'params': self.module.params}
+        with self.lock:
+            for name in names:
+                if name not in self.gathered:
+                    continue
+                if name in self.facts:
+                    result['facts'][name] = self.facts[name]
+                else:
+                    result['errors'][name] = self.errors[name]
+                result['age'][name] = round(now - self.gathered[name], 1)
+            return json.dumps(result)
+
+
+def _handle(agent, conn):
+    """
+    Internal function that answers one client
+    """
+    try:
+        conn.settimeout(5)
+        request = b''
+        while not request.endswith(b'\n') and len(request) < MAX_REQUEST:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            request += chunk
+        names = json.loads(request.decode('utf-8')).get('names') or []
+        conn.sendall(agent.answer([str(name) for name in names]).encode('utf-8'))
+    except (socket.error, socket.timeout, ValueError, AttributeError):
+        pass
+    finally:
+        conn.close()
+
+
+def serve(agent, path):
+    """
+    serves the facts of agent on the UNIX socket path, only root can connect to it
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    while True:
+        conn, address = server.accept()
+        t = threading.Thread(target=_handle, args=(agent, conn))
+        t.daemon = True
+        t.start()
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--socket', default=AGENT_SOCKET, help='the UNIX socket to serve on (%default)')
+    parser.add_option('--interval', type='float', default=300,
+                      help='seconds after which a collector is gathered again (%default)')
+    parser.add_option('--check', type='float', default=10,
+                      help='seconds between the checks of the source files of the collectors (%default)')
+    parser.add_option('--collector-timeout', type='float', default=300, help='see AIX_facts (%default)')
+    parser.add_option('--lpps-method', default='lslpp', choices=['lslpp', 'odm'], help='see AIX_facts (%default)')
+    parser.add_option('--mount-timeout', type='float', default=5, help='see AIX_facts (%default)')
+    parser.add_option('--cache-dir', default=CACHE_DIR, help='where oslevel -s is cached (%default)')
+    parser.add_option('--pidfile', help='file to write the pid of the agent to')
+    parser.add_option('--fact-file', help='facts.d file to write the facts to after every refresh')
+    parser.add_option('--once', action='store_true', help='gather once, write the fact file and exit')
+    options, args = parser.parse_args(argv)
+
+    module = AgentModule({'lpps_method': options.lpps_method, 'mount_timeout': options.mount_timeout,
+                          'oslevel_method': 'oslevel', 'oslevel_cache': True, 'cache_dir': options.cache_dir})
+    collectors = [(name, __import__('ansible.module_utils.aix.' + name, fromlist=[name]))
+                  for name in AGENT_COLLECTORS]
+    agent = FactsAgent(module, collectors, options.interval, options.collector_timeout or None)
+    if options.once:
+        agent.refresh()
+        if options.fact_file:
+            agent.write_fact_file(options.fact_file)
+        return 0
+    if options.pidfile:
+        with open(options.pidfile, 'w') as f:
+            f.write('%d\n' % os.getpid())
+
+    t = threading.Thread(target=serve, args=(agent, options.socket))
+    t.daemon = True
+    t.start()
+    while t.is_alive():
+        if agent.refresh() and options.fact_file:
+            try:
+                agent.write_fact_file(options.fact_file)
+            except (IOError, OSError, TypeError, ValueError):
+                pass
+        time.sleep(options.check)
+    return 1
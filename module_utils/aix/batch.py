@@ -0,0 +1,148 @@
+#
+# Runs the commands of the collectors in one shell
+#
+# Forking the python process of the module is expensive on AIX, so in batch mode
+# the commands of all collectors are started by one /bin/sh, in parallel. The shell
+# writes their stdout one after the other between delimiters which hold the exit
+# code, and their stderr to files in a temporary directory.
+#
+import os
+import shutil
+import tempfile
+import uuid
+
+try:
+    from pipes import quote
+except ImportError:
+    from shlex import quote
+
+from ansible.module_utils.aix.commands import run_with_deadline
+
+
+def command_key(args):
+    """
+    returns the key of a command in the outputs of run_batch, the command
+    string of a shell command or the tuple of the arguments
+    """
+    if isinstance(args, (list, tuple)):
+        return tuple(args)
+    return args
+
+
+def batch_script(commands, tmpdir, delimiter):
+    """
+    returns the shell script which runs the commands in the background and prints
+    their output, f.i. for the commands ['/usr/bin/oslevel', '-s'] and '/usr/sbin/mount'
+        ( ( /usr/bin/oslevel -s ) </dev/null >tmpdir/0.out 2>tmpdir/0.err; echo $? >tmpdir/0.rc ) &
+        ( ( /usr/sbin/mount ) </dev/null >tmpdir/1.out 2>tmpdir/1.err; echo $? >tmpdir/1.rc ) &
+        wait
+        echo '<delimiter> 0'; cat tmpdir/0.out; echo; echo '<delimiter> 0' `cat tmpdir/0.rc`
+        ...
+    A list is a command with its arguments, a string is a shell command, like run_command.
+    The echo after the output ends an output without a newline, the end delimiter starts
+    with the newline of that echo.
+    """
+    lines = []
+    for i, args in enumerate(commands):
+        if isinstance(args, (list, tuple)):
+            args = ' '.join(quote(arg) for arg in args)
+        path = quote(os.path.join(tmpdir, str(i)))
+        lines.append('( ( %s ) </dev/null >%s.out 2>%s.err; echo $? >%s.rc ) &' % (args, path, path, path))
+    lines.append('wait')
+    for i in range(len(commands)):
+        path = quote(os.path.join(tmpdir, str(i)))
+        lines.append("echo '%s %d'; cat %s.out; echo; echo '%s %d' `cat %s.rc`" % (
+            delimiter, i, path, delimiter, i, path))
+    return '\n'.join(lines) + '\n'
+
+
+def split_batch_output(out, count, delimiter):
+    """
+    splits the output of the batch script in the stdout and exit code of every command.
+    It returns a list with (rc, stdout) for every command, or None for a command
+    whose output is missing, f.i. when the shell was killed.
+    """
+    results = [None] * count
+    pos = 0
+    for i in range(count):
+        begin = '%s %d\n' % (delimiter, i)
+        end = '\n%s %d ' % (delimiter, i)
+        start = out.find(begin, pos)
+        if start < 0:
+            break
+        start += len(begin)
+        stop = out.find(end, start)
+        if stop < 0:
+            break
+        eol = out.find('\n', stop + len(end))
+        if eol < 0:
+            eol = len(out)
+        try:
+            rc = int(out[stop + len(end):eol])
+        except ValueError:
+            rc = None
+        pos = eol
+        if rc is not None:
+            # the newline in front of the end delimiter is the one of the echo
+            results[i] = (rc, out[start:stop])
+    return results
+
+
+def _read_job(tmpdir, i):
+    """
+    Internal function that returns the (rc, stdout) a command of a killed batch left
+    in tmpdir, or None if it did not finish
+    """
+    path = os.path.join(tmpdir, str(i))
+    try:
+        with open(path + '.rc', 'r') as f:
+            rc = int(f.read())
+        with open(path + '.out', 'r') as f:
+            return rc, f.read()
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def run_batch(module, commands, deadline=None):
+    """
+    runs the commands in one /bin/sh and returns a dictionary with the
+    (rc, stdout, stderr) of every command by its command_key.
+    A command whose output could not be read is not in the dictionary, so it is
+    run on its own when the collector asks for it. The batch is best effort.
+    With a deadline, a time like time.time(), the shell and its commands are killed
+    when they did not finish at the deadline. The output of the commands which
+    finished is read from their files, the commands which did not are in the
+    dictionary with None, they timed out.
+    """
+    if not commands:
+        return {}
+    tmpdir = tempfile.mkdtemp(prefix='AIX_facts')
+    delimiter = '--AIX_facts-%s--' % uuid.uuid4().hex
+    outputs = {}
+    try:
+        script = batch_script(commands, tmpdir, delimiter)
+        if deadline is None:
+            rc, out, err = module.run_command(['/bin/sh'], data=script, binary_data=True)
+            killed = False
+        else:
+            rc, out, err, killed = run_with_deadline(module, ['/bin/sh'], deadline, data=script)
+        if killed:
+            results = [_read_job(tmpdir, i) for i in range(len(commands))]
+        elif rc != 0:
+            return outputs
+        else:
+            results = split_batch_output(out, len(commands), delimiter)
+        for i, result in enumerate(results):
+            if result is None:
+                if killed:
+                    outputs[command_key(commands[i])] = None
+                continue
+            try:
+                with open(os.path.join(tmpdir, '%d.err' % i), 'r') as f:
+                    cmd_err = f.read()
+            except (IOError, OSError):
+                cmd_err = ''
+            outputs[command_key(commands[i])] = (result[0], result[1], cmd_err)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return outputs
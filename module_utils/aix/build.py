@@ -0,0 +1,25 @@
+#
+# The build collector, the site specific BUILD of the host
+#
+import os
+
+
+def get_build(module):
+    """
+    reads the /var/adm/autoinstall/etc/BUILD to determine the BUILS,
+    if this fails, it reads the /etc/BUILD
+    the output is the BUILD version
+    """
+    build = {}
+    org_file = '/var/adm/autoinstall/etc/BUILD'
+    copy_file = '/etc/BUILD'
+    try:
+        if os.path.exists(org_file):
+            build = ''.join([line.strip() for line in open(org_file, 'r')])
+    except IOError as e:
+        try:
+            if os.path.exists(copy_file):
+                build = ''.join([line.strip() for line in open(copy_file, 'r')])
+        except IOError as e:
+            module.fail_json(msg="could not determine BUILD", rc=1, err=str(e))
+    return build
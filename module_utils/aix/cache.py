@@ -0,0 +1,81 @@
+#
+# The on host cache of the collectors, an entry is kept as long as the files
+# it was made from did not change
+#
+import os
+import glob
+import time
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+# the default directory of the cache on the host
+CACHE_DIR = '/var/adm/ansible/AIX_facts'
+
+# the installed software lives in the product and lpp ODM classes of the usr, root and share parts,
+# the rpm database and the efix database
+SOFTWARE_SOURCES = ('/usr/lib/objrepos/product*', '/usr/lib/objrepos/lpp*',
+                    '/etc/objrepos/product*', '/etc/objrepos/lpp*',
+                    '/usr/share/lib/objrepos/product*', '/usr/share/lib/objrepos/lpp*',
+                    '/opt/freeware/packages/Packages', '/usr/emgrdata/DBS/*')
+
+
+def fingerprint(sources):
+    """
+    returns the path, mtime and size of every file matching
+    the glob patterns in sources, sorted on path.
+    """
+    result = []
+    for pattern in sources:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            result.append([path, st.st_mtime, st.st_size])
+    return result
+
+
+def cache_load(cache_dir, name, fingerprint, ttl):
+    """
+    returns the cache entry of collector name,
+    or None if there is no entry, or the entry is older than ttl seconds,
+    or it was made from other source files than fingerprint.
+    With ttl None an entry does not expire.
+    """
+    try:
+        with open(os.path.join(cache_dir, name + '.json'), 'r') as f:
+            entry = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if entry.get('fingerprint') != fingerprint:
+        return None
+    if ttl is not None and time.time() - entry.get('time', 0) > ttl:
+        return None
+    return entry
+
+
+def cache_store(cache_dir, name, fingerprint, facts):
+    """
+    writes the facts of collector name to the cache.
+    The entry is written to a temporary file and renamed, so a reader never
+    sees a partial entry. The cache is best effort, errors are ignored,
+    the temporary file is removed then.
+    """
+    tmp = None
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix='.' + name)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'time': time.time(), 'facts': facts}, f)
+        os.rename(tmp, os.path.join(cache_dir, name + '.json'))
+    except (IOError, OSError, TypeError, ValueError):
+        if tmp is not None and os.path.exists(tmp):
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,177 @@
+#
+# Running the AIX commands for the collectors
+#
+import os
+import sys
+import shlex
+import signal
+import time
+import tempfile
+import threading
+import subprocess
+
+# colon separated directories with stand-ins for the AIX commands, f.i. the fake
+# command suite of the benchmarks, which are used instead of the real commands
+BIN_PATH_ENV = 'ANSIBLE_AIX_BIN_PATH'
+
+
+def _override_dirs():
+    """
+    Internal function that returns the directories in ANSIBLE_AIX_BIN_PATH
+    """
+    return [d for d in os.environ.get(BIN_PATH_ENV, '').split(':') if d]
+
+
+def bin_path(path):
+    """
+    returns the path of the AIX command path, f.i. /usr/bin/lslpp, or the command with
+    the same name in a directory of ANSIBLE_AIX_BIN_PATH, if it is there
+    """
+    for directory in _override_dirs():
+        candidate = os.path.join(directory, os.path.basename(path))
+        if os.path.exists(candidate):
+            return candidate
+    return path
+
+
+def get_bin_path(module, name, required=False):
+    """
+    module.get_bin_path, which looks in the directories of ANSIBLE_AIX_BIN_PATH first
+    """
+    return module.get_bin_path(name, required, opt_dirs=_override_dirs())
+
+
+def _new_session():
+    """
+    Internal function that returns the Popen arguments which start the command in a session
+    of its own, so the command and everything it starts is one process group
+    """
+    if sys.version_info[0] >= 3:
+        return {'start_new_session': True}
+    return {'preexec_fn': os.setsid}
+
+
+def _native(data):
+    """
+    Internal function that returns the bytes a command wrote as a native string
+    """
+    if sys.version_info[0] >= 3:
+        return data.decode('utf-8', 'surrogateescape')
+    return data
+
+
+class Deadline(object):
+    """
+    Kills the process group of the process p when it still runs at the deadline,
+    a time like time.time(). fired tells if it was killed.
+    """
+    def __init__(self, p, deadline):
+        self.fired = False
+        self._p = p
+        self._timer = threading.Timer(max(deadline - time.time(), 0), self._kill)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _kill(self):
+        self.fired = True
+        try:
+            os.killpg(self._p.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def cancel(self):
+        self._timer.cancel()
+
+
+def run_with_deadline(module, args, deadline, data=None, use_unsafe_shell=False):
+    """
+    runs a command like module.run_command, but in a session of its own and the whole process
+    group is killed when it did not finish at the deadline, a time like time.time(),
+    or never with deadline None. It returns the rc, stdout, stderr and True if the command was killed.
+    """
+    real_module = getattr(module, '_module', module)
+    shell = False
+    if not isinstance(args, (list, tuple)):
+        if use_unsafe_shell:
+            shell = True
+        else:
+            args = shlex.split(args)
+    env = dict(os.environ)
+    env.update(getattr(real_module, 'run_command_environ_update', None) or {})
+    try:
+        p = subprocess.Popen(args, shell=shell, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, env=env, close_fds=True, **_new_session())
+    except OSError as e:
+        return 2, '', str(e), False
+    timer = None
+    if deadline is not None:
+        timer = Deadline(p, deadline)
+    try:
+        if data is not None and not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        out, err = p.communicate(data)
+    finally:
+        if timer is not None:
+            timer.cancel()
+    return p.returncode, _native(out), _native(err), timer is not None and timer.fired
+
+
+def iter_command(module, args, msg):
+    """
+    runs a command and yields its stdout line by line,
+    so the output is parsed while it is read instead of being held in memory as a whole.
+    If the command fails, fail_json is called with msg after the output is read.
+    A module without the run_command_environ_update of the AnsibleModule, f.i. a stub which
+    replays output, or a module which has the output prefetched in a batch, is asked for
+    the whole output with run_command.
+    A module with a count_command method, like the CollectorModule, gets the bytes
+    the command wrote to stdout.
+    A module with a deadline, like the CollectorModule with collector_timeout, has the
+    command killed at the deadline, fail_json gets timed_out then.
+    """
+    real_module = getattr(module, '_module', module)
+    prefetched = getattr(module, 'prefetched', None)
+    if not hasattr(real_module, 'run_command_environ_update') or (prefetched is not None and prefetched(args)):
+        rc, out, err = module.run_command(args)
+        for line in out.splitlines():
+            yield line
+    else:
+        env = dict(os.environ)
+        env.update(getattr(real_module, 'run_command_environ_update', None) or {})
+        deadline = getattr(module, 'deadline', None)
+        kwargs = {}
+        if deadline is not None:
+            kwargs = _new_session()
+        errfile = tempfile.TemporaryFile()
+        try:
+            p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=errfile, env=env,
+                                 close_fds=True, **kwargs)
+        except OSError as e:
+            errfile.close()
+            module.fail_json(msg=msg, rc=2, err=str(e))
+        timer = None
+        if deadline is not None:
+            timer = Deadline(p, deadline)
+        stdout_bytes = 0
+        try:
+            # the lines are read as bytes, a byte which is no utf-8, f.i. in a latin-1
+            # description, must not break the whole output
+            for line in p.stdout:
+                stdout_bytes += len(line)
+                yield _native(line)
+        finally:
+            p.stdout.close()
+            rc = p.wait()
+            if timer is not None:
+                timer.cancel()
+            count_command = getattr(module, 'count_command', None)
+            if count_command is not None:
+                count_command(stdout_bytes)
+        errfile.seek(0)
+        err = _native(errfile.read())
+        errfile.close()
+        if timer is not None and timer.fired:
+            module.fail_json(msg=msg + ", it did not finish within collector_timeout", rc=rc, err=err,
+                             timed_out=True)
+    if rc != 0:
+        module.fail_json(msg=msg, rc=rc, err=err)
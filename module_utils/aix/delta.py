@@ -0,0 +1,130 @@
+#
+# Delta facts, the records which changed since an earlier gather
+#
+# After a gather the list facts in DELTA_KEYS are kept in a snapshot on the host,
+# named after the fingerprint of their content. A later gather which gives that
+# fingerprint gets only the records that were added, removed or changed.
+#
+import os
+import hashlib
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+# the facts which can be returned as a delta, with the key which identifies a record
+DELTA_KEYS = {
+    'lpps': 'Fileset',
+    'filesystems': 'MountPoint',
+    'mounts': 'mount',
+}
+
+# number of snapshots kept on the host, the oldest are removed
+SNAPSHOTS_KEPT = 10
+
+
+def content_hash(facts):
+    """
+    returns the sha1 of the facts of a collector, serialized with sorted keys
+    """
+    return hashlib.sha1(json.dumps(facts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def gather_fingerprint(hashes):
+    """
+    returns the fingerprint of a gather, the sha1 of the hashes of its collectors
+    """
+    return hashlib.sha1(json.dumps(hashes, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def snapshot_load(snapshot_dir, name):
+    """
+    returns the snapshot of the gather with fingerprint name, or None if there is none.
+    The name comes from the play, so it must be a hex sha1 to be used as a file name.
+    """
+    if len(name) != 40 or not all(c in '0123456789abcdef' for c in name):
+        return None
+    try:
+        with open(os.path.join(snapshot_dir, name + '.json'), 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def snapshot_store(snapshot_dir, name, snapshot):
+    """
+    writes the snapshot of the gather with fingerprint name, if it is not there yet, and removes
+    all but the SNAPSHOTS_KEPT newest. The write is atomic and best effort.
+    """
+    path = os.path.join(snapshot_dir, name + '.json')
+    try:
+        if os.path.exists(path):
+            os.utime(path, None)
+        else:
+            if not os.path.isdir(snapshot_dir):
+                os.makedirs(snapshot_dir, 0o700)
+            fd, tmp = tempfile.mkstemp(dir=snapshot_dir, prefix='.snapshot')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(snapshot, f)
+            os.rename(tmp, path)
+        snapshots = [os.path.join(snapshot_dir, entry) for entry in os.listdir(snapshot_dir)
+                     if entry.endswith('.json')]
+        snapshots.sort(key=os.path.getmtime, reverse=True)
+        for old in snapshots[SNAPSHOTS_KEPT:]:
+            os.remove(old)
+    except (IOError, OSError):
+        pass
+
+
+def diff_records(old, new, key):
+    """
+    compares two lists of records on key and returns a dictionary with
+    the new records in added, the key of the records which are gone in removed
+    and the new version of the records which differ in changed.
+    """
+    old_by_key = dict((record.get(key), record) for record in old)
+    new_keys = set()
+    added = []
+    changed = []
+    for record in new:
+        k = record.get(key)
+        new_keys.add(k)
+        if k not in old_by_key:
+            added.append(record)
+        elif old_by_key[k] != record:
+            changed.append(record)
+    removed = sorted(k for k in old_by_key if k not in new_keys)
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def make_delta(facts, since, snapshot_dir):
+    """
+    replaces the facts in DELTA_KEYS with their delta since the gather with fingerprint since,
+    and keeps a snapshot of this gather.
+    A fact which is not in the snapshot of since, or an unknown since, is left complete.
+    It returns the facts_delta result: the fingerprint of this gather, the hash of every
+    fact, the names of the facts returned as a delta and their delta.
+    """
+    names = sorted(name for name in DELTA_KEYS if name in facts)
+    hashes = dict((name, content_hash(facts[name])) for name in names)
+    current = gather_fingerprint(hashes)
+    previous = None
+    if since:
+        previous = snapshot_load(snapshot_dir, since)
+    snapshot_store(snapshot_dir, current, {'hashes': hashes, 'facts': dict((name, facts[name]) for name in names)})
+
+    result = {'fingerprint': current, 'since': since if previous is not None else None,
+              'hashes': hashes, 'collectors': {}}
+    if previous is not None:
+        for name in names:
+            if name not in previous['facts']:
+                continue
+            if previous['hashes'].get(name) == hashes[name]:
+                delta = {'added': [], 'removed': [], 'changed': []}
+            else:
+                delta = diff_records(previous['facts'][name], facts[name], DELTA_KEYS[name])
+            result['collectors'][name] = delta
+            del facts[name]
+    return result
@@ -0,0 +1,242 @@
+#
+# Runs the collectors in a pool of worker threads
+#
+# A collector is a module of this package with a get_<name> function, which gets
+# the AnsibleModule and returns the fact <name>. A collector with a CACHE_SOURCES
+# tuple of glob patterns can be cached, see cache. If the fact depends on the
+# parameters of the module, the collector has a cache_key function which gets
+# the module and returns a string, the entry is kept per cache_key.
+#
+# With a timeout every collector has a deadline, the commands it runs are killed
+# when it passes, see commands.run_with_deadline. A collector which hangs
+# outside a command is given up on a little later, its worker is replaced.
+#
+import hashlib
+import threading
+import time
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from ansible.module_utils.aix.batch import command_key, run_batch
+from ansible.module_utils.aix.cache import fingerprint, cache_load, cache_store
+from ansible.module_utils.aix.commands import run_with_deadline
+
+# number of collectors that run at the same time
+MAX_WORKERS = 4
+
+# seconds after its deadline a collector is given up on, its commands are killed at the deadline
+DEADLINE_GRACE = 2
+
+
+class CollectorError(Exception):
+    """
+    Raised instead of exiting when a collector calls fail_json in a worker thread.
+    The result holds the keyword arguments given to fail_json.
+    """
+    def __init__(self, result):
+        Exception.__init__(self, result.get('msg', 'collector failed'))
+        self.result = result
+
+
+class CollectorModule(object):
+    """
+    Wrapper around the AnsibleModule which is handed to a collector
+    running in a worker thread. fail_json would exit the whole process from
+    that thread, so it raises CollectorError instead. Everything else is
+    passed on to the real module.
+    It counts the commands the collector runs and the bytes they write to stdout.
+    run_command answers a command which ran in the batch with its output from prefetched,
+    a dictionary with the (rc, stdout, stderr) by command_key.
+    With a deadline, a time like time.time(), the commands are killed when they
+    did not finish at the deadline and fail_json is called with timed_out.
+    """
+    def __init__(self, module, prefetched=None, deadline=None):
+        self._module = module
+        self._prefetched = prefetched or {}
+        self.deadline = deadline
+        self.commands = 0
+        self.stdout_bytes = 0
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise CollectorError(kwargs)
+
+    def count_command(self, stdout_bytes):
+        self.commands += 1
+        self.stdout_bytes += stdout_bytes
+
+    def prefetched(self, args):
+        """
+        returns True if the output of the command is prefetched
+        """
+        return command_key(args) in self._prefetched
+
+    def _timed_out(self, args):
+        self.fail_json(msg="%s did not finish within collector_timeout" % (command_key(args),), rc=-9,
+                       timed_out=True)
+
+    def run_command(self, args, **kwargs):
+        key = command_key(args)
+        if key in self._prefetched:
+            if self._prefetched[key] is None:
+                self._timed_out(args)
+            rc, out, err = self._prefetched[key]
+        elif self.deadline is not None:
+            rc, out, err, killed = run_with_deadline(self._module, args, self.deadline, data=kwargs.get('data'),
+                                                     use_unsafe_shell=kwargs.get('use_unsafe_shell', False))
+            if killed:
+                self._timed_out(args)
+        else:
+            rc, out, err = self._module.run_command(args, **kwargs)
+        self.count_command(len(out or ''))
+        return rc, out, err
+
+
+def count_records(facts):
+    """
+    returns the number of records in the facts of a collector,
+    the length of a list or dictionary, 1 for another value and 0 for no value.
+    """
+    if facts is None:
+        return 0
+    if isinstance(facts, (list, dict)):
+        return len(facts)
+    return 1
+
+
+def run_collectors(module, collectors, max_workers=MAX_WORKERS, cache_dir=None, cache_ttl=0, batch=False,
+                   timeout=None):
+    """
+    runs the collectors in a bounded pool of worker threads,
+    so the gather takes about as long as the slowest collector.
+    collectors is a list of (fact name, collector module) tuples, the collector
+    modules are imported by the caller, in the main thread.
+    If cache_dir is given, the collectors with CACHE_SOURCES return their cached
+    facts as long as their source files did not change and the entry is not
+    older than cache_ttl seconds.
+    With batch, the commands the collectors which are not cached give with
+    batch_commands are run up front in one shell, see batch, and the collectors
+    get their output from run_command.
+    With timeout, every collector (and the batch) gets timeout seconds, the commands
+    which run longer are killed and the collector fails with timed_out in its error.
+    It returns the facts of the collectors that succeeded, a dictionary
+    with the error of every collector that failed, a dictionary with
+    'hit' or 'miss' for every cached collector and a dictionary with the
+    profile of every collector: its wall time, the number of commands it ran,
+    the bytes they wrote to stdout and the number of records it returned.
+    The profile of the batch is in it as batch.
+    """
+    facts = {}
+    errors = {}
+    cache_status = {}
+    profile = {}
+    pending = queue.Queue()
+    commands = []
+    for name, collector in collectors:
+        sources = getattr(collector, 'CACHE_SOURCES', None)
+        current = None
+        entry_name = name
+        if cache_dir and sources:
+            start = time.time()
+            current = fingerprint(sources)
+            if hasattr(collector, 'cache_key'):
+                key = collector.cache_key(module)
+                entry_name = '%s-%s' % (name, hashlib.sha1(key.encode('utf-8')).hexdigest()[:12])
+            entry = cache_load(cache_dir, entry_name, current, cache_ttl)
+            if entry is not None:
+                facts[name] = entry['facts']
+                cache_status[name] = 'hit'
+                profile[name] = {'seconds': round(time.time() - start, 4), 'commands': 0,
+                                 'stdout_bytes': 0, 'records': count_records(facts[name])}
+                continue
+            cache_status[name] = 'miss'
+        if batch and hasattr(collector, 'batch_commands'):
+            commands.extend(collector.batch_commands(module))
+        pending.put((name, collector, entry_name, current))
+
+    prefetched = {}
+    if commands:
+        start = time.time()
+        prefetched = run_batch(module, commands, deadline=start + timeout if timeout else None)
+        profile['batch'] = {'seconds': round(time.time() - start, 4), 'commands': len(prefetched),
+                            'stdout_bytes': sum(len(output[1]) for output in prefetched.values() if output),
+                            'records': 0}
+
+    # the collectors which run, by name, with their start and CollectorModule
+    running = {}
+    # the number of collectors which did not finish and were not given up on
+    remaining = [pending.qsize()]
+    done = threading.Condition()
+
+    def finish(name, wrapped, start):
+        profile[name] = {'seconds': round(time.time() - start, 4),
+                         'commands': wrapped.commands,
+                         'stdout_bytes': wrapped.stdout_bytes,
+                         'records': count_records(facts.get(name))}
+        remaining[0] -= 1
+        done.notify()
+
+    def collect(name, collector, entry_name, current, wrapped):
+        fact = error = None
+        try:
+            fact = getattr(collector, 'get_' + name)(wrapped)
+        except CollectorError as e:
+            error = e.result
+        except Exception as e:
+            error = {'msg': "%s: %s" % (e.__class__.__name__, e)}
+        # the entry is written before finish, run_collectors returns when the last one finished
+        # and the module exits, which would stop a write afterwards halfway
+        if error is None and current is not None:
+            cache_store(cache_dir, entry_name, current, fact)
+        with done:
+            if name not in running:
+                # given up on, see below
+                return False
+            start = running.pop(name)[0]
+            if error is None:
+                facts[name] = fact
+            else:
+                errors[name] = error
+            finish(name, wrapped, start)
+        return True
+
+    def worker():
+        while True:
+            try:
+                name, collector, entry_name, current = pending.get_nowait()
+            except queue.Empty:
+                return
+            start = time.time()
+            wrapped = CollectorModule(module, prefetched, deadline=start + timeout if timeout else None)
+            with done:
+                running[name] = (start, wrapped)
+            if not collect(name, collector, entry_name, current, wrapped):
+                # another worker took over
+                return
+
+    def start_worker():
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+
+    for i in range(min(max_workers, pending.qsize())):
+        start_worker()
+    with done:
+        while remaining[0] > 0:
+            done.wait(0.5 if timeout else None)
+            if not timeout:
+                continue
+            now = time.time()
+            for name, (start, wrapped) in list(running.items()):
+                if now - start > timeout + DEADLINE_GRACE:
+                    del running[name]
+                    errors[name] = {'msg': "collector %s did not finish within collector_timeout" % name,
+                                    'timed_out': True}
+                    finish(name, wrapped, start)
+                    start_worker()
+    return facts, errors, cache_status, profile
@@ -0,0 +1,50 @@
+#
+# The export of the facts to a facts.d file, which setup returns as ansible_local
+#
+# The file holds the facts, facts_errors and generated_at, the time of the gather
+# in seconds since the epoch, f.i. ansible_local.aix.oslevel and
+# ansible_local.aix.generated_at for /etc/ansible/facts.d/aix.fact.
+#
+import os
+import time
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+FACT_FILE = '/etc/ansible/facts.d/aix.fact'
+
+
+def fact_file_content(facts, errors, generated_at=None):
+    """
+    returns the facts, the errors and generated_at as one dictionary, the content of the fact file
+    """
+    content = dict(facts)
+    content['facts_errors'] = errors
+    content['generated_at'] = int(generated_at if generated_at is not None else time.time())
+    return content
+
+
+def write_fact_file(path, facts, errors, generated_at=None):
+    """
+    writes the facts to the fact file path as json, to a temporary file which is renamed,
+    so setup never reads a partial file. It returns the generated_at it wrote.
+    Raises IOError or OSError when it can not be written.
+    """
+    content = fact_file_content(facts, errors, generated_at)
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o755)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(content, f, sort_keys=True)
+        os.chmod(tmp, 0o644)
+        os.rename(tmp, path)
+    except (IOError, OSError):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return content['generated_at']
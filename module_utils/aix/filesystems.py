@@ -0,0 +1,23 @@
+#
+# The filesystems collector
+#
+from ansible.module_utils.aix.commands import bin_path, iter_command
+from ansible.module_utils.aix.parsers import iter_colon_records
+
+CACHE_SOURCES = ('/etc/filesystems',)
+
+
+def batch_commands(module):
+    """
+    returns the commands get_filesystems runs, for the batch
+    """
+    return [[bin_path("/usr/sbin/lsfs"), "-c"]]
+
+
+def get_filesystems(module):
+    """
+    runs the lsfs -c and delivers the output to iter_colon_records
+    for creating the filesystems fact
+    """
+    lines = iter_command(module, [bin_path("/usr/sbin/lsfs"), "-c"], "could not determine lsfs list")
+    return list(iter_colon_records(lines))
@@ -0,0 +1,30 @@
+#
+# The lparstat collector, the partition configuration of lparstat -i
+#
+from ansible.module_utils.aix.commands import bin_path
+
+
+def batch_commands(module):
+    """
+    returns the commands get_lparstat runs, for the batch
+    """
+    return [[bin_path("/usr/bin/lparstat"), "-i"]]
+
+
+def get_lparstat(module):
+    lijst = []
+    adict = {}
+    rc, out, err = module.run_command([bin_path("/usr/bin/lparstat"), "-i"])
+    if rc != 0:
+        module.fail_json(msg="ERROR: could not complete lparstat -i", rc=rc, err=err)
+    for line in out.splitlines():
+        key, value = line.split(":")
+        key = key.strip().replace(' ', '_')
+        value = value.strip().split(" ")
+        value[0] = value[0].replace('%', '')
+        if len(value) == 2:
+            if value[1] == 'GB':
+                value[0] = float(value[0]) * 1024
+        adict[key] = value[0]
+    lijst.append(adict)
+    return lijst
@@ -0,0 +1,233 @@
+#
+# The lpps collector, the installed filesets and RPMs
+#
+import fnmatch
+import re
+
+from ansible.module_utils.aix.cache import SOFTWARE_SOURCES
+from ansible.module_utils.aix.commands import bin_path, get_bin_path, iter_command
+from ansible.module_utils.aix.parsers import iter_colon_records, parse_odm_stanzas
+
+CACHE_SOURCES = SOFTWARE_SOURCES
+
+# the ODM directories holding the product class of the usr and share parts
+ODM_PRODUCT_DIRS = ('/usr/lib/objrepos', '/usr/share/lib/objrepos')
+
+# the columns of lslpp -Lc, in the order of its output
+LPP_KEYS = ('Package_Name', 'Fileset', 'Level', 'State', 'PTF_Id', 'Fix_State', 'Type',
+            'Description', 'Destination_Dir.', 'Uninstaller', 'Message_Catalog',
+            'Message_Set', 'Message_Number', 'Parent', 'Automatic', 'EFIX_Locked',
+            'Install_Path', 'Build_Date')
+
+# the product state in the ODM translated to the Fix State of lslpp
+PRODUCT_FIX_STATE = {'3': 'A', '5': 'C', '7': 'B'}
+
+# the columns which are kept by lpps_fields anyway, lpps_by_fileset and the delta need them
+LPP_KEEP_KEYS = ('Fileset', 'Level')
+
+# the Type of lslpp of a RPM, every other Type is an installp fileset
+RPM_TYPE = 'R'
+
+
+# the compiled lpps_include patterns, by the tuple of the patterns
+_include_patterns = {}
+
+
+def _include_pattern(patterns):
+    """
+    Internal function that compiles the lpps_include patterns to one regex, once,
+    a pattern is a glob unless it starts with re:
+    Raises ValueError for a re: pattern which is no valid regex.
+    """
+    key = tuple(patterns)
+    if key not in _include_patterns:
+        parts = []
+        for pattern in patterns:
+            if pattern.startswith('re:'):
+                try:
+                    re.compile(pattern[3:])
+                except re.error as e:
+                    raise ValueError("invalid regex in lpps_include %s: %s" % (pattern, e))
+                parts.append('(?:%s)$' % pattern[3:])
+            else:
+                parts.append(fnmatch.translate(pattern))
+        _include_patterns[key] = re.compile('|'.join(parts))
+    return _include_patterns[key]
+
+
+def check_lpps_params(module):
+    """
+    checks lpps_fields and lpps_types and compiles lpps_include, and calls fail_json when
+    they are not valid. AIX_facts calls it before any collector runs, so bad input fails
+    the same way whether the lpps are gathered or come from the agent.
+    """
+    unknown = sorted(set(module.params.get('lpps_fields') or []) - set(LPP_KEYS))
+    if unknown:
+        module.fail_json(msg="unknown lpps_fields: %s, valid are %s" % (', '.join(unknown), ', '.join(LPP_KEYS)),
+                         rc=1)
+    unknown = sorted(set(module.params.get('lpps_types') or []) - set(['LPP', 'RPM']))
+    if unknown:
+        module.fail_json(msg="unknown lpps_types: %s, valid are LPP, RPM" % ', '.join(unknown), rc=1)
+    try:
+        _include_pattern(module.params.get('lpps_include') or [])
+    except ValueError as e:
+        module.fail_json(msg=str(e), rc=1)
+
+
+def select_lpps(module, records):
+    """
+    filters the lpps records on lpps_include and lpps_types and keeps the columns
+    of lpps_fields of them, while the records stream by. Without these parameters
+    the records are passed on as they are. The parameters are checked by check_lpps_params.
+    """
+    include = module.params.get('lpps_include')
+    types = module.params.get('lpps_types')
+    fields = module.params.get('lpps_fields')
+    if not include and not types and not fields:
+        return records
+    if fields:
+        fields = [k for k in LPP_KEYS if k in fields or k in LPP_KEEP_KEYS]
+    match = include and _include_pattern(include).match
+    rpm = None
+    if types and len(set(types)) == 1:
+        rpm = types[0] == 'RPM'
+    return _iter_selected(records, match, rpm, fields)
+
+
+def _iter_selected(records, match, rpm, fields):
+    """
+    Internal function of select_lpps, rpm is None when both types are wanted
+    """
+    for record in records:
+        if match and not match(record.get('Fileset', '')):
+            continue
+        if rpm is not None and (record.get('Type') == RPM_TYPE) != rpm:
+            continue
+        if fields:
+            record = dict((k, record[k]) for k in fields if k in record)
+        yield record
+
+
+def _rpm_command(rpm_path):
+    """
+    Internal function that returns the rpm query for the columns of lslpp -Lc, tab separated
+    """
+    return [rpm_path, "-qa", "--queryformat",
+            "%{NAME}\\t%{VERSION}-%{RELEASE}\\t%{INSTALLPREFIX}\\t%{BUILDTIME:date}\\t%{SUMMARY}\\n"]
+
+
+def _get_lpps_odm(module):
+    """
+    Internal function that builds the lpps records from the product class of the ODM
+    and from the rpm database, instead of running lslpp -Lc.
+    The product class has an entry for the base level and for every update of a fileset,
+    the highest level is used. The columns which are not in the ODM get the value lslpp
+    shows for a fileset without them.
+    """
+    filesets = {}
+    for odmdir in ODM_PRODUCT_DIRS:
+        # env is used to set ODMDIR, run_command would change the environment of the other collectors
+        rc, out, err = module.run_command(["/usr/bin/env", "ODMDIR=" + odmdir, bin_path("/usr/bin/odmget"),
+                                           "product"])
+        if rc != 0:
+            module.fail_json(msg="could not read the product class in " + odmdir, rc=rc, err=err)
+        for product in parse_odm_stanzas(out):
+            level = tuple(int(product.get(k) or 0) for k in ('ver', 'rel', 'mod', 'fix'))
+            fileset = product.get('lpp_name', '')
+            if fileset in filesets and filesets[fileset][0] >= level:
+                continue
+            filesets[fileset] = (level, product)
+    lpps = []
+    for fileset in sorted(filesets):
+        level, product = filesets[fileset]
+        record = dict.fromkeys(LPP_KEYS, ' ')
+        record.update({'Package_Name': product.get('name', ''),
+                       'Fileset': fileset,
+                       'Level': '%d.%d.%d.%d' % level,
+                       'PTF_Id': product.get('ptf') or ' ',
+                       'Fix_State': PRODUCT_FIX_STATE.get(product.get('state'), '?'),
+                       'Description': product.get('description', ''),
+                       'Automatic': '0',
+                       'EFIX_Locked': '0',
+                       'Install_Path': '/',
+                       'Build_Date': ''})
+        lpps.append(record)
+    lpps.sort(key=lambda r: (r['Package_Name'], r['Fileset']))
+    rpm_path = get_bin_path(module, "rpm")
+    if rpm_path:
+        rc, out, err = module.run_command(_rpm_command(rpm_path))
+        if rc != 0:
+            module.fail_json(msg="could not determine rpm list", rc=rc, err=err)
+        for line in sorted(out.splitlines()):
+            fields = line.split('\t', 4)
+            if len(fields) != 5:
+                continue
+            name, level, prefix, build_date, summary = fields
+            record = dict.fromkeys(LPP_KEYS, ' ')
+            record.update({'Package_Name': name,
+                           'Fileset': name + '-' + level,
+                           'Level': level,
+                           'Fix_State': 'C',
+                           'Type': 'R',
+                           'Description': summary,
+                           'Uninstaller': '/bin/rpm -e ' + name,
+                           'Automatic': '0',
+                           'EFIX_Locked': '0',
+                           'Install_Path': prefix if prefix != '(none)' else ' ',
+                           'Build_Date': build_date})
+            lpps.append(record)
+    return lpps
+
+
+def cache_key(module):
+    """
+    the lpps of another lpps_method, filter or projection are cached apart
+    """
+    return repr([module.params.get(k) or None for k in ('lpps_method', 'lpps_include', 'lpps_types', 'lpps_fields')])
+
+
+def batch_commands(module):
+    """
+    returns the commands get_lpps runs, for the batch
+    """
+    if module.params.get('lpps_method') == 'odm':
+        commands = [["/usr/bin/env", "ODMDIR=" + odmdir, bin_path("/usr/bin/odmget"), "product"]
+                    for odmdir in ODM_PRODUCT_DIRS]
+        rpm_path = get_bin_path(module, "rpm")
+        if rpm_path:
+            commands.append(_rpm_command(rpm_path))
+        return commands
+    return [[bin_path("/usr/bin/lslpp"), "-Lc"]]
+
+
+def get_lpps(module):
+    """
+    runs the lslpp -Lc and delivers the output to iter_colon_records
+    for creating the lpps fact
+    with lpps_method odm the records are built from the ODM by _get_lpps_odm
+    lpps_include, lpps_types and lpps_fields are applied by select_lpps while the records are parsed
+    """
+    if module.params.get('lpps_method') == 'odm':
+        return list(select_lpps(module, _get_lpps_odm(module)))
+    lines = iter_command(module, [bin_path("/usr/bin/lslpp"), "-Lc"], "could not determine lslpp list")
+    return list(select_lpps(module, iter_colon_records(lines)))
+
+
+def _index_name(lpp):
+    """
+    Internal function that returns the name of lpp in lpps_by_fileset, the Fileset of an RPM
+    is <name>-<Level>, f.i. bash-4.3-2, which is indexed on its name, bash, like rpm -q takes it
+    """
+    fileset = lpp['Fileset']
+    level = lpp.get('Level')
+    if level and fileset.endswith('-' + level):
+        return fileset[:-len(level) - 1]
+    return fileset
+
+
+def index_lpps(lpps):
+    """
+    returns the level of every fileset in lpps by its name, and of every RPM by its name
+    without the version, so a play can look up a fileset without a loop over all lpps.
+    """
+    return dict((_index_name(lpp), lpp['Level']) for lpp in lpps if 'Fileset' in lpp)
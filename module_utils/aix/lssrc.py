@@ -0,0 +1,34 @@
+#
+# The lssrc collector, the subsystems of the System Resource Controller
+#
+try:
+    from itertools import izip
+except ImportError:
+    izip = zip
+
+from ansible.module_utils.aix.commands import bin_path
+
+
+def batch_commands(module):
+    """
+    returns the commands get_lssrc runs, for the batch
+    """
+    return [[bin_path("/usr/bin/lssrc"), "-a"]]
+
+
+def get_lssrc(module):
+    lijst = []
+    rc, out, err = module.run_command([bin_path("/usr/bin/lssrc"), "-a"])
+    if rc != 0:
+        module.fail_json(msg="ERROR: Could not complete lssrc ", rc=rc, err=err)
+    firstline = True
+    for line in out.splitlines():
+        if firstline == True:
+            keys = line.split()
+            firstline = False
+        else:
+            # lssrc output is colomn formatted without specific separator, so use exact positions for each field!
+            values = [line[0:18].strip(), line[18:34].strip(), line[34:48].strip(), line[48:60].strip()]
+            adict = dict(izip(keys, values))
+            lijst.append(adict)
+    return lijst
@@ -0,0 +1,141 @@
+#
+# The mounts collector, the mounted filesystems with their size
+#
+import os
+import re
+import threading
+import time
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from ansible.module_utils.aix.commands import bin_path
+
+# number of statvfs calls on mountpoints that run at the same time
+MOUNT_WORKERS = 8
+
+
+def _get_mount_size_facts(mountpoint):
+    """
+    Internal module to determine the filesystem size and free size in bites
+    The input is teh mountpoint
+    """
+    size_total = None
+    size_available = None
+    try:
+        statvfs_result = os.statvfs(mountpoint)
+        size_total = statvfs_result.f_frsize * statvfs_result.f_blocks
+        size_available = statvfs_result.f_frsize * (statvfs_result.f_bavail)
+    except OSError:
+        pass
+    return size_total, size_available
+
+
+def _get_mount_sizes(mountpoints, timeout, max_workers=MOUNT_WORKERS):
+    """
+    Internal function that runs _get_mount_size_facts for the mountpoints in a pool of worker threads.
+    A statvfs which does not return within timeout seconds, f.i. on a stale nfs or a hung jfs2 mount,
+    is given up and the mountpoint is returned as stale. The blocked worker can not be stopped,
+    so a new worker takes its place.
+    It returns a dictionary mountpoint: (size_total, size_available) and the set of stale mountpoints.
+    """
+    mountpoints = set(mountpoints)
+    sizes = {}
+    started = {}
+    stale = set()
+    pending = queue.Queue()
+    for mountpoint in mountpoints:
+        pending.put(mountpoint)
+    done = threading.Condition()
+
+    def worker():
+        while True:
+            try:
+                mountpoint = pending.get_nowait()
+            except queue.Empty:
+                return
+            with done:
+                started[mountpoint] = time.time()
+            size = _get_mount_size_facts(mountpoint)
+            with done:
+                if mountpoint not in stale:
+                    sizes[mountpoint] = size
+                done.notify()
+
+    def start_worker():
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+
+    for i in range(min(max_workers, len(mountpoints))):
+        start_worker()
+    with done:
+        while len(sizes) + len(stale) < len(mountpoints):
+            now = time.time()
+            wait = timeout
+            for mountpoint, start in started.items():
+                if mountpoint in sizes or mountpoint in stale:
+                    continue
+                if now - start >= timeout:
+                    stale.add(mountpoint)
+                    start_worker()
+                else:
+                    wait = min(wait, start + timeout - now)
+            done.wait(wait)
+    return sizes, stale
+
+
+def batch_commands(module):
+    """
+    returns the commands get_mounts runs, for the batch
+    """
+    return [bin_path("/usr/sbin/mount")]
+
+
+def get_mounts(module):
+    """
+    create a lists with mounted filesystems
+    it calls to _get_mount_sizes to determine the size and free size
+    a local mount which does not answer within mount_timeout seconds gets
+    size_total and size_available None and stale True
+    it outputs all mounts
+    """
+    mounts = []
+    local_mounts = []
+    # AIX does not have mtab but mount command is only source of info (or to use
+    # api calls to get same info)
+    rc, out, err = module.run_command(bin_path("/usr/sbin/mount"))
+    if rc !=0:
+        module.fail_json(msg="could not determine mounts", rc=rc, err=err)
+    else:
+        for line in out.splitlines():
+            fields = line.split()
+            if len(fields) != 0 and fields[0] != 'node' and fields[0][0] != '-' and re.match('^/.*|^[a-zA-Z].*|^[0-9].*', fields[0]):
+                if re.match('^/', fields[0]):
+                    # normal mount
+                    mount = {'mount': fields[1],
+                             'device': fields[0],
+                             'fstype' : fields[2],
+                             'options': fields[6],
+                             'time': '%s %s %s' % ( fields[3], fields[4], fields[5])}
+                    mounts.append(mount)
+                    local_mounts.append(mount)
+                else:
+                    # nfs or cifs based mount
+                    # in case of nfs if no mount options are provided on command line
+                    # add into fields empty string...
+                    if len(fields) < 8: fields.append("")
+                    mounts.append({'mount': fields[2],
+                                   'device': '%s:%s' % (fields[0], fields[1]),
+                                   'fstype' : fields[3],
+                                   'options': fields[7],
+                                   'time': '%s %s %s' % ( fields[4], fields[5], fields[6])})
+    sizes, stale = _get_mount_sizes([m['mount'] for m in local_mounts],
+                                    module.params.get('mount_timeout', 5))
+    for mount in local_mounts:
+        mount['size_total'], mount['size_available'] = sizes.get(mount['mount'], (None, None))
+        if mount['mount'] in stale:
+            mount['stale'] = True
+    return mounts
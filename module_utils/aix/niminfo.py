@@ -0,0 +1,66 @@
+#
+# The niminfo collector, the nim configuration of the client in /etc/niminfo
+#
+import os
+
+# the nim configuration of the client
+NIMINFO = '/etc/niminfo'
+
+
+def parse_niminfo(lines):
+    """
+    converts the lines of the niminfo to a dictionary.
+    the niminfo looks like:
+     #------------------ Network Install Manager ---------------
+     # warning - this file contains NIM configuration information
+     #       and should only be updated by NIM
+     export NIM_NAME=rn12402pl
+     export NIM_HOSTNAME=rn12402pl.itc.testlab.intranet
+     export NIM_CONFIGURATION=standalone
+     export NIM_MASTER_HOSTNAME=rn100pgpl.itc.testlab.intranet
+     export NIM_MASTER_PORT=1058
+     export NIM_REGISTRATION_PORT=1059
+     export NIM_SHELL="nimsh"
+     export NIM_MASTERID=00F62C634C00
+     export NIM_FIPS_MODE=0
+     export NIM_BOS_IMAGE=/SPOT/usr/sys/inst.images/installp/ppc/bos
+     export NIM_BOS_FORMAT=rte
+     export NIM_HOSTS=" 127.0.0.1:loopback:localhost  172.27.8.43:rn12402pl.itc.testlab.intranet  172.27.8.18:rn100pgpl.itc.testlab.intranet "
+     export NIM_MOUNTS=""
+     export ROUTES=" default:0:172.27.8.1 "
+    The comments and empty lines are skipped, 'export ' is removed and the line is split
+    on the first '=', so a value may hold an '=' itself. The value is stripped from
+    blanks and quotes.
+    """
+    niminfo = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('export '):
+            line = line[7:]
+        key, sep, value = line.partition('=')
+        if sep:
+            niminfo[key.strip()] = value.strip(' "\n')
+    return niminfo
+
+
+def read_niminfo(path=None):
+    """
+    returns the niminfo of path, default NIMINFO, as a dictionary
+    or an empty dictionary if the host has no niminfo, f.i. a nim master.
+    IOError is raised if the file can not be read.
+    """
+    if path is None:
+        path = NIMINFO
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return parse_niminfo(f)
+
+
+def get_niminfo(module):
+    try:
+        return read_niminfo()
+    except IOError as e:
+        module.fail_json(msg="could not read " + NIMINFO, rc=1, err=str(e))
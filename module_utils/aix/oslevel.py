@@ -0,0 +1,127 @@
+#
+# The oslevel collector
+#
+try:
+    from itertools import izip
+except ImportError:
+    izip = zip
+
+from ansible.module_utils.aix.cache import SOFTWARE_SOURCES, fingerprint, cache_load, cache_store
+from ansible.module_utils.aix.commands import bin_path, iter_command
+from ansible.module_utils.aix.parsers import iter_colon_records
+
+# the oslevel changes with the installed software only
+CACHE_SOURCES = SOFTWARE_SOURCES
+
+# the fileset the oslevel is derived from
+OSLEVEL_FILESET = 'bos.rte'
+
+
+def _cached_oslevel_s(cache_dir):
+    """
+    Internal function that returns the fingerprint of the installed software and the
+    cached output of oslevel -s, or None if it is not cached for this fingerprint.
+    Without the software databases, f.i. on another os, the fingerprint is empty.
+    """
+    current = fingerprint(SOFTWARE_SOURCES)
+    if not current:
+        return current, None
+    entry = cache_load(cache_dir, 'oslevel_s', current, None)
+    if entry is None:
+        return current, None
+    return current, entry['facts']
+
+
+def oslevel_s(module, cache_dir=None, store=True):
+    """
+    returns the output of oslevel -s, <OS Ver>-<TL>-<SP>-<BUILD DATE>
+    oslevel -s walks the whole software inventory, so with cache_dir the output is kept
+    in the cache as long as the installed software does not change, there is no ttl.
+    Without store an entry in cache_dir is used, but none is written.
+    Without the software databases, f.i. on another os, nothing is cached.
+    """
+    current = None
+    if cache_dir:
+        current, out = _cached_oslevel_s(cache_dir)
+        if out is not None:
+            return out
+    rc, out, err = module.run_command([bin_path("/usr/bin/oslevel"), "-s"])
+    if rc != 0:
+        module.fail_json(msg="could not determine oslevel", rc=rc, err=err)
+    out = out.strip('\n')
+    if current and store:
+        cache_store(cache_dir, 'oslevel_s', current, out)
+    return out
+
+
+def split_oslevel_s(out):
+    """
+    splits the output of oslevel -s, f.i. 7100-04-03-1543 in OS_Ver 71, TL 04, SP 03
+    and BUILD_DATE 1543. TL and SP keep their two digits, like derive_oslevel gives them.
+    """
+    keys = ('OS_Ver', 'TL', 'SP', 'BUILD_DATE')
+    values = out.strip().split('-')
+    if values[0].endswith('00'):
+        values[0] = values[0][:-2]
+    return dict(izip(keys, values))
+
+
+def derive_oslevel(lpps):
+    """
+    derives the os version and the technology level from the level of bos.rte in lpps,
+    f.i. bos.rte 7.1.4.30 gives OS_Ver 71, TL 04 and oslevel_r 7100-04, the format
+    split_oslevel_s gives them in.
+    The service pack and the build date can not be derived from a fileset level,
+    so there is no SP, BUILD_DATE and oslevel_s. It returns None without bos.rte.
+    """
+    for lpp in lpps:
+        if lpp.get('Fileset') == OSLEVEL_FILESET:
+            ver, rel, mod = (lpp['Level'].split('.') + ['0', '0', '0'])[:3]
+            os_ver = ver + rel
+            tl = '%02d' % int(mod)
+            return {'oslevel_r': '%s00-%s' % (os_ver, tl), 'OS_Ver': os_ver, 'TL': tl, 'derived': True}
+    return None
+
+
+def cache_key(module):
+    """
+    a derived oslevel has other keys than the one of oslevel -s, so they are cached apart
+    """
+    return module.params.get('oslevel_method') or 'oslevel'
+
+
+def batch_commands(module):
+    """
+    returns the commands get_oslevel runs, for the batch
+    """
+    if module.params.get('oslevel_method') == 'derive':
+        return [[bin_path("/usr/bin/lslpp"), "-Lc", OSLEVEL_FILESET]]
+    if module.params.get('oslevel_cache') and module.params.get('cache_dir'):
+        if _cached_oslevel_s(module.params['cache_dir'])[1] is not None:
+            return []
+    return [[bin_path("/usr/bin/oslevel"), "-s"]]
+
+
+def get_oslevel(module):
+    """
+    get the oslevel function delivers oslvel -s output
+    <OS Ver>-<TL>-<SP>-<BUILD DATE>
+    as wel OV_Version, the tecnology level, TL, the Servicepack, SP and the BUILD_DATE,
+    with oslevel_cache the output of oslevel -s comes from the cache while the software did not change
+    with oslevel_method derive only the os version and TL are derived from the level of bos.rte
+    """
+    if module.params.get('oslevel_method') == 'derive':
+        lines = iter_command(module, [bin_path("/usr/bin/lslpp"), "-Lc", OSLEVEL_FILESET],
+                             "could not determine the level of " + OSLEVEL_FILESET)
+        oslevel = derive_oslevel(iter_colon_records(lines))
+        if oslevel is None:
+            module.fail_json(msg="could not derive oslevel, %s is not installed" % OSLEVEL_FILESET, rc=1)
+        return oslevel
+    cache_dir = None
+    if module.params.get('oslevel_cache'):
+        cache_dir = module.params.get('cache_dir')
+    out = oslevel_s(module, cache_dir)
+    lijst = {'oslevel_s': out}
+    lijst.update(split_oslevel_s(out))
+
+    return lijst
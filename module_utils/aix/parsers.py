@@ -0,0 +1,101 @@
+#
+# Parsers for the output of the AIX commands, shared by the collectors
+#
+from operator import itemgetter
+
+try:
+    from itertools import izip
+except ImportError:
+    izip = zip
+
+
+def iter_colon_records(lines):
+    """
+    converts colon separated lines to dictionaries, one per line.
+    A line starting with an '#' contains the keys of the next lines.
+    F.i.
+        #MountPoint:Device:Vfs:Nodename:Type:Size:Options:AutoMount:Acct
+        /:/dev/hd4:jfs2::bootfs:524288:rw:yes:no
+        /usr:/dev/hd2:jfs2::bootfs:8912896:rw:yes:no
+    All records share one key tuple, and values which repeat, like ' ', 'C', '0'
+    or a level, are stored once.
+    """
+    keys = None
+    pool = {}
+    intern_value = pool.setdefault
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith('#'):
+            keys = tuple(line[1:].replace(' ', '_').split(':'))
+        elif keys is not None:
+            values = line.split(":")
+            yield dict(izip(keys, map(intern_value, values, values)))
+
+
+def convert_out_to_list(out):
+    """
+    converts colon separtated output to a list of dictionaries.
+    The first line of the out contains the keys, and starts with an '#'
+    see iter_colon_records
+    """
+    return list(iter_colon_records(out.splitlines()))
+
+
+def parse_odm_stanzas(out):
+    """
+    converts odmget output to a list of dictionaries, one per stanza.
+    Strings are unquoted, numbers are kept as strings and a value continued
+    with a backslash at the end of the line is joined with the next line.
+    F.i.
+        product:
+                lpp_name = "bos.rte"
+                name = "bos"
+                ver = 7
+    """
+    lijst = []
+    stanza = None
+    pending = None
+    for line in out.split('\n'):
+        if pending is not None:
+            line = pending + line
+            pending = None
+        if line.endswith('\\'):
+            pending = line[:-1]
+            continue
+        if not line:
+            continue
+        if line[0] in ' \t':
+            key, sep, value = line.partition('=')
+            if sep and stanza is not None:
+                value = value.strip()
+                if value[:1] == '"' and value[-1:] == '"':
+                    value = value[1:-1]
+                stanza[key.strip()] = value
+        elif line.rstrip().endswith(':'):
+            stanza = {}
+            lijst.append(stanza)
+    return lijst
+
+
+def records_to_columns(records):
+    """
+    converts a list of dictionaries to a dictionary with the sorted keys in columns
+    and the values of every record, in the order of the columns, in rows.
+    A key a record does not have gets the value None.
+    F.i.
+        [{'Subsystem': 'named', 'Status': 'active'}, {'Subsystem': 'nfsd', 'Status': 'inoperative'}]
+    becomes
+        {'columns': ['Status', 'Subsystem'], 'rows': [['active', 'named'], ['inoperative', 'nfsd']]}
+    so the keys are sent once instead of once per record.
+    """
+    keys = set()
+    for record in records:
+        keys.update(record)
+    columns = sorted(keys)
+    if len(columns) > 1 and all(len(record) == len(columns) for record in records):
+        # every record has every key, the usual case, itemgetter fetches them in one call
+        getter = itemgetter(*columns)
+        rows = [list(getter(record)) for record in records]
+    else:
+        rows = [[record.get(column) for column in columns] for record in records]
+    return {'columns': columns, 'rows': rows}
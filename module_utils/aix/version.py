@@ -0,0 +1,101 @@
+#
+# Comparison of the levels of LPPs and the versions of RPMs
+#
+# An LPP level is V.R.M.F, f.i. 7.1.4.30, an RPM version is [epoch:]version-release,
+# f.i. 1.9-9 or 1:2.4.1-3. version_key returns a key which sorts them the way
+# installp and rpm do: a part of digits is compared as a number, so 7.1.4.30 is newer
+# than 7.1.4.4, a part of digits is newer than a part of letters and a longer version
+# is newer than its prefix, 1.0.1 is newer than 1.0. Like rpm, a ~ sorts before
+# everything, so 1.0~rc1 is older than 1.0.
+#
+# The keys are memoized, a module compares the same few levels over and over.
+# This module imports nothing of ansible, the filter plugins load it from its path.
+#
+import re
+
+# the parts of a version: a tilde, a run of digits or a run of letters
+VERSION_PART = re.compile(r'(~)|([0-9]+)|([a-zA-Z]+)')
+
+# the kind of a part in a key, the end of a version sorts between a tilde and a part
+TILDE, END, ALPHA, NUMBER = -2, -1, 0, 1
+
+# the number of keys which are memoized before the memo is cleared
+MAX_KEYS = 65536
+
+_keys = {}
+
+
+def _parts_key(version):
+    """
+    Internal function that returns the key of a version or release without epoch
+    """
+    if version.replace('.', '').isdigit():
+        # the common case, an LPP level or a numeric RPM version
+        parts = [(NUMBER, int(part)) for part in version.split('.') if part]
+    else:
+        parts = []
+        for tilde, number, alpha in VERSION_PART.findall(version):
+            if tilde:
+                parts.append((TILDE, 0))
+            elif number:
+                parts.append((NUMBER, int(number)))
+            else:
+                parts.append((ALPHA, alpha))
+    parts.append((END, 0))
+    return tuple(parts)
+
+
+def version_key(version):
+    """
+    returns the key of an LPP level or an RPM version, a tuple of (epoch, version, release),
+    which compares like installp and rpm compare them. An LPP level has epoch 0 and no release.
+    """
+    try:
+        return _keys[version]
+    except KeyError:
+        pass
+    epoch = 0
+    rest = version.strip()
+    if ':' in rest:
+        head, tail = rest.split(':', 1)
+        if head.isdigit():
+            epoch, rest = int(head), tail
+    if '-' in rest:
+        rest, release = rest.rsplit('-', 1)
+    else:
+        release = ''
+    key = (epoch, _parts_key(rest), _parts_key(release))
+    if len(_keys) >= MAX_KEYS:
+        _keys.clear()
+    _keys[version] = key
+    return key
+
+
+def compare_versions(a, b):
+    """
+    returns -1, 0 or 1 if the version a is older than, the same as or newer than b
+    """
+    key_a = version_key(a)
+    key_b = version_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def sort_versions(versions):
+    """
+    returns the versions sorted from the oldest to the latest, without duplicates
+    """
+    return sorted(set(versions), key=version_key)
+
+
+def latest_version(versions, newer_than=None):
+    """
+    returns the latest of the versions, which are sorted by sort_versions, or None if there
+    are none. With newer_than it returns None as well when the latest is not newer than it.
+    """
+    if not versions:
+        return None
+    latest = versions[-1]
+    if newer_than is not None and version_key(latest) <= version_key(newer_than):
+        return None
+    return latest
+
@@ -0,0 +1,71 @@
+#
+# The vgs collector, the physical volumes of the active volume groups
+#
+import re
+
+from ansible.module_utils.aix.commands import get_bin_path
+
+
+def batch_commands(module):
+    """
+    returns the commands get_vgs runs, lsvg -p and lsvg of the active vgs,
+    or no commands if lsvg or xargs is not there
+    """
+    lsvg_path = get_bin_path(module, "lsvg")
+    xargs_path = get_bin_path(module, "xargs")
+    if not (lsvg_path and xargs_path):
+        return []
+    return ["%s -o| %s %s -p" % (lsvg_path, xargs_path, lsvg_path),
+            "%s -o| %s %s" % (lsvg_path, xargs_path, lsvg_path)]
+
+
+def get_vgs(module):
+    """
+    Get vg and pv Facts
+    $ lsvg -o |xargs lsvg -p
+    rootvg:
+    PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION
+    hdisk0            active            400         117         29..00..00..40..48
+    midwarevg:
+    PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION
+    hdisk1            active            400         3           00..00..00..00..03
+    altdiskvg:
+    PV_NAME           PV STATE          TOTAL PPs   FREE PPs    FREE DISTRIBUTION
+    hdisk2            active            399         399         80..80..79..80..80
+    the PP SIZE of all vgs comes from one lsvg run for all of them
+    $ lsvg -o |xargs lsvg
+    VOLUME GROUP:       rootvg                   VG IDENTIFIER:  00f62c6300004c000000015a2d6f1bb4
+    VG STATE:           active                   PP SIZE:        128 megabyte(s)
+    ...
+    so the number of commands does not grow with the number of vgs
+    """
+
+    commands = batch_commands(module)
+    vgs = {}
+    if commands:
+        rc, out, err = module.run_command(commands[0], use_unsafe_shell=True)
+        if rc != 0:
+            module.fail_json(msg="could not determine lsvg |xargs lsvg -p", rc=rc, err=err)
+        if out:
+            # xargs fails when lsvg fails for one of the vgs, the others are in info anyway,
+            # so only a vg without a PP SIZE is left out
+            rc, info, err = module.run_command(commands[1], use_unsafe_shell=True)
+            pp_sizes = {}
+            vg = None
+            for n in re.finditer(r'VOLUME GROUP:\s+(\S+)|PP SIZE:\s+(\d+\s+\S+)', info):
+                if n.group(1):
+                    vg = n.group(1)
+                elif vg is not None and vg not in pp_sizes:
+                    pp_sizes[vg] = n.group(2)
+            for m in re.finditer(r'(\S+):\n.*FREE DISTRIBUTION(\n(\S+)\s+(\w+)\s+(\d+)\s+(\d+).*)+', out):
+                vgs[m.group(1)] = []
+                if m.group(1) in pp_sizes:
+                    for n in re.finditer(r'(\S+)\s+(\w+)\s+(\d+)\s+(\d+).*', m.group(0)):
+                        pv_info = {'pv_name': n.group(1),
+                                   'pv_state': n.group(2),
+                                   'total_pps': n.group(3),
+                                   'free_pps': n.group(4),
+                                   'pp_size': pp_sizes[m.group(1)]
+                                   }
+                        vgs[m.group(1)].append(pv_info)
+    return vgs
@@ -0,0 +1,90 @@
+#
+# The streamed parse of colon separated command output, iter_command with iter_colon_records
+#
+# Needs ansible to be importable, like the benchmarks.
+#
+#   python -m unittest discover tests
+#
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+try:
+    import benchutil
+    benchutil.add_module_utils()
+    from ansible.module_utils.aix.agent import AgentModule
+    from ansible.module_utils.aix.commands import iter_command
+    from ansible.module_utils.aix.parsers import iter_colon_records
+except ImportError:
+    AgentModule = None
+
+# lslpp -Lc like output with a blank line, a second header and a last line without a newline
+OUTPUT = (b'#Package Name:Fileset:Level:State:PTF Id:Fix State:Type:Description\n'
+          b'bos:bos.rte:7.1.4.30: : :C: :Base Operating System Runtime\n'
+          b'\n'
+          b'bos:bos.rte.libc:7.1.4.30: :U870001:C: :libc Library\n'
+          b'#MountPoint:Device:Vfs\n'
+          b'/:/dev/hd4:jfs2\n'
+          b'/usr:/dev/hd2:jfs2')
+
+# a description in latin-1, which is no utf-8
+LATIN1_OUTPUT = (b'#Package Name:Fileset:Level:Description\n'
+                 b'bos:bos.rte:7.1.4.30:Syst\xe8me de base\n'
+                 b'bos:bos.net.tcp.client:7.1.4.30:TCP/IP Client Support\n')
+
+
+def convert_out_to_list(out):
+    """
+    the parser of AIX_facts before the output was streamed, _convert_out_to_list
+    """
+    lijst = []
+    for line in out.splitlines():
+        if line.startswith('#'):
+            line = line[1:]
+            line = line.replace(' ', '_')
+            keys = line.split(":")
+        else:
+            values = line.split(":")
+            adict = dict(zip(keys, values))
+            lijst.append(adict)
+    return lijst
+
+
+def native(data):
+    if sys.version_info[0] >= 3:
+        return data.decode('utf-8', 'surrogateescape')
+    return data
+
+
+@unittest.skipIf(AgentModule is None, "ansible is not importable")
+class IterCommandTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def stream(self, output):
+        path = os.path.join(self.tmpdir, 'out')
+        with open(path, 'wb') as f:
+            f.write(output)
+        return list(iter_colon_records(iter_command(AgentModule({}), ['/bin/cat', path], "could not cat")))
+
+    def test_same_records_as_before(self):
+        self.assertEqual(self.stream(OUTPUT), convert_out_to_list(native(OUTPUT)))
+
+    def test_no_utf8(self):
+        records = self.stream(LATIN1_OUTPUT)
+        self.assertEqual(records, convert_out_to_list(native(LATIN1_OUTPUT)))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]['Fileset'], 'bos.net.tcp.client')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#
+# A streamed collector which fails, its error written to a fact file
+#
+# Needs ansible to be importable, like the benchmarks.
+#
+#   python -m unittest discover tests
+#
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+try:
+    import benchutil
+    benchutil.add_module_utils()
+    from ansible.module_utils.aix.agent import AgentModule
+    from ansible.module_utils.aix.commands import iter_command
+    from ansible.module_utils.aix.engine import run_collectors
+    from ansible.module_utils.aix.factsd import write_fact_file
+except ImportError:
+    AgentModule = None
+
+
+class FailingCollector(object):
+    """
+    a collector which streams a command that writes to stderr and fails
+    """
+    @staticmethod
+    def get_failing(module):
+        lines = iter_command(module, ['/bin/sh', '-c', 'echo out; echo broken >&2; exit 3'],
+                             "could not run the command")
+        return list(lines)
+
+
+@unittest.skipIf(AgentModule is None, "ansible is not importable")
+class StreamedErrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_error_is_written_to_the_fact_file(self):
+        facts, errors, cache_status, profile = run_collectors(AgentModule({}), [('failing', FailingCollector)])
+        self.assertNotIn('failing', facts)
+        self.assertEqual(errors['failing']['rc'], 3)
+        self.assertEqual(errors['failing']['err'], 'broken\n')
+
+        path = os.path.join(self.tmpdir, 'aix.fact')
+        write_fact_file(path, facts, errors)
+        with open(path) as f:
+            content = json.load(f)
+        self.assertEqual(content['facts_errors']['failing']['err'], 'broken\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
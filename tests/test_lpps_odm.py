@@ -0,0 +1,113 @@
+#
+# The lpps of lpps_method odm, built from the captured odmget and rpm -qa output
+# in benchmarks/fixtures, checked against the lslpp -Lc of the same host
+#
+# Needs ansible to be importable, like the benchmarks.
+#
+#   python -m unittest discover tests
+#
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, '..', 'benchmarks', 'fixtures')
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+try:
+    import benchutil
+    lpps = benchutil.load_collector('lpps')
+    parsers = benchutil.load_collector('parsers')
+except ImportError:
+    lpps = None
+
+# the columns the ODM does not hold: lslpp takes the build date of a fileset from
+# the lpp class and splits the date of an RPM on its colons, EFIX_Locked of an RPM is blank
+NOT_COMPARED = ('Build_Date', 'EFIX_Locked')
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+class ReplayModule(object):
+    """
+    Stands in for the AnsibleModule, run_command returns the output for the command
+    """
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.params = {'lpps_method': 'odm'}
+
+    def run_command(self, args, **kwargs):
+        if args[0] == '/usr/bin/env':
+            return 0, self.outputs[args[1]], ''
+        return 0, self.outputs[os.path.basename(args[0])], ''
+
+    def get_bin_path(self, name, *args, **kwargs):
+        return '/usr/bin/' + name
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs)
+
+
+def _fixture_outputs():
+    return {'ODMDIR=/usr/lib/objrepos': _read('odmget_product_usr.txt'),
+            'ODMDIR=/usr/share/lib/objrepos': _read('odmget_product_share.txt'),
+            'rpm': _read('rpm_qa.txt')}
+
+
+@unittest.skipIf(lpps is None, "ansible is not importable")
+class OdmLppsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.records = lpps._get_lpps_odm(ReplayModule(_fixture_outputs()))
+        self.by_fileset = dict((record['Fileset'], record) for record in self.records)
+
+    def test_every_record_is_the_one_of_lslpp(self):
+        expected = parsers.convert_out_to_list(_read('lslpp_Lc.txt'))
+        self.assertEqual(sorted(self.by_fileset), sorted(record['Fileset'] for record in expected))
+        for record in expected:
+            odm = self.by_fileset[record['Fileset']]
+            self.assertEqual(sorted(odm), sorted(lpps.LPP_KEYS))
+            for key in lpps.LPP_KEYS:
+                if key not in NOT_COMPARED:
+                    self.assertEqual(odm[key], record[key], '%s %s' % (record['Fileset'], key))
+
+    def test_highest_update_over_base_level(self):
+        # the product class holds bos.rte 7.1.4.0 and the update 7.1.4.30
+        self.assertEqual(self.by_fileset['bos.rte']['Level'], '7.1.4.30')
+        self.assertEqual(self.by_fileset['bos.rte']['PTF_Id'], 'U868735')
+        self.assertEqual(self.by_fileset['bos.rte.libc']['Level'], '7.1.4.31')
+
+    def test_highest_update_before_base_level(self):
+        outputs = _fixture_outputs()
+        outputs['ODMDIR=/usr/lib/objrepos'] = (
+            'product:\n\tlpp_name = "bos.rte"\n\tname = "bos"\n\tver = 7\n\trel = 1\n\tmod = 4\n\tfix = 30\n'
+            '\tptf = "U868735"\n\tstate = 5\n\tdescription = "Base Operating System Runtime"\n\n'
+            'product:\n\tlpp_name = "bos.rte"\n\tname = "bos"\n\tver = 7\n\trel = 1\n\tmod = 4\n\tfix = 0\n'
+            '\tptf = ""\n\tstate = 5\n\tdescription = "Base Operating System Runtime"\n')
+        records = [record for record in lpps._get_lpps_odm(ReplayModule(outputs)) if record['Fileset'] == 'bos.rte']
+        self.assertEqual([(record['Level'], record['PTF_Id']) for record in records], [('7.1.4.30', 'U868735')])
+
+    def test_base_level_only(self):
+        self.assertEqual(self.by_fileset['BESClient']['Level'], '9.5.4.38')
+        self.assertEqual(self.by_fileset['BESClient']['PTF_Id'], ' ')
+        # the share part is in another ODM directory
+        self.assertEqual(self.by_fileset['bos.man.en_US.cmds']['Level'], '7.1.4.0')
+
+    def test_rpm_records(self):
+        curl = self.by_fileset['curl-7.52.1-1']
+        self.assertEqual(curl['Package_Name'], 'curl')
+        self.assertEqual(curl['Level'], '7.52.1-1')
+        self.assertEqual(curl['Type'], 'R')
+        self.assertEqual(curl['Uninstaller'], '/bin/rpm -e curl')
+        self.assertEqual(curl['Install_Path'], '/opt/freeware')
+        self.assertEqual(curl['Build_Date'], 'Thu Feb 23 05:18:09 CST 2017')
+        self.assertEqual(self.by_fileset['cdrecord-1.9-9']['Level'], '1.9-9')
+        # the RPMs follow the installp filesets
+        self.assertEqual([record['Type'] for record in self.records][-2:], ['R', 'R'])
+
+
+if __name__ == '__main__':
+    unittest.main()